@@ -12,10 +12,16 @@ Course:         Artificial Intelligence
 Date:           2024 December
 '''
 
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox
+import app
+import book
+import movegen
+import notation
 import pieces  # Ensure you import your "pieces" module
-import random
+from board import BISHOP, BLACK, KING, KNIGHT, PAWN, QUEEN, ROOK, TYPE_NAMES, WHITE
 
 # Initialize pieces
 pieces.initialize_pieces()
@@ -47,18 +53,45 @@ canvas2.grid(row=0, column=1, padx=10, pady=10)
 info_label = tk.Label(root, text="", font=("Arial", 14), padx=10, pady=5, anchor='w')
 info_label.grid(row=1, column=0, columnspan=2, sticky="w")
 
-# Dictionary of Unicode symbols for chess pieces
+# Ends the robot's search early; it plays the best move found so far
+stop_button = tk.Button(root, text="Stop search", state="disabled", command=lambda: stop_search())
+stop_button.grid(row=2, column=0, columnspan=2, pady=5)
+
+SEARCH_POLL_MS = 100  # Milliseconds between two looks at the robot's search
+
+# Unicode symbols for chess pieces, indexed by piece type code and color code
 PIECE_SYMBOLS = {
-    "King": {"White": "♔", "Black": "♚"},
-    "Queen": {"White": "♕", "Black": "♛"},
-    "Rook": {"White": "♖", "Black": "♜"},
-    "Bishop": {"White": "♗", "Black": "♝"},
-    "Knight": {"White": "♘", "Black": "♞"},
-    "Pawn": {"White": "♙", "Black": "♟"}
+    KING: ("♔", "♚"),
+    QUEEN: ("♕", "♛"),
+    ROOK: ("♖", "♜"),
+    BISHOP: ("♗", "♝"),
+    KNIGHT: ("♘", "♞"),
+    PAWN: ("♙", "♟")
 }
 
+def create_board_items(canvas):
+    # Creates the 64 squares and 64 (empty) piece texts of a canvas once. Returns the item ids and what every square
+    # shows, indexed by row * 8 + col, so draw_board can change only what differs.
+
+    squares, texts, shown = [], [], []
+    for row in range(8):
+        for col in range(8):
+            x1 = col * CELL_SIZE
+            y1 = row * CELL_SIZE
+            x2 = x1 + CELL_SIZE
+            y2 = y1 + CELL_SIZE
+            color = COLOR1 if (row + col) % 2 == 0 else COLOR2
+            squares.append(canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black"))
+            texts.append(canvas.create_text((x1 + x2) // 2, (y1 + y2) // 2, text="", fill="black",
+                                            font=("Arial", 28, "bold")))
+            shown.append((color, "", "black"))
+    return squares, texts, shown
+
 def draw_board(canvas, board, highlighted_moves=None):
-    canvas.delete("all")  # Clear the canvas
+    # Brings the canvas up to date with the board. Only the squares whose fill or piece changed since the last call
+    # are reconfigured; nothing is deleted or created.
+
+    squares, texts, shown = board_items[canvas]
     for row in range(8):
         for col in range(8):
             # Determine the color of the cell
@@ -66,23 +99,26 @@ def draw_board(canvas, board, highlighted_moves=None):
                 color = HIGHLIGHT_COLOR  # Highlight possible moves
             else:
                 color = COLOR1 if (row + col) % 2 == 0 else COLOR2
-
-            x1 = col * CELL_SIZE
-            y1 = row * CELL_SIZE
-            x2 = x1 + CELL_SIZE
-            y2 = y1 + CELL_SIZE
-            # Draw rectangle
-            canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-            # Draw pieces (if present)
             piece = board[row][col]
             if piece:
                 symbol = PIECE_SYMBOLS[piece.piece_type][piece.color]  # Get Unicode symbol
-                canvas.create_text(
-                    (x1 + x2) // 2, (y1 + y2) // 2,
-                    text=symbol,
-                    fill="black" if piece.color == "Black" else "red",
-                    font=("Arial", 28, "bold")
-                )
+                text_color = "black" if piece.color == BLACK else "red"
+            else:
+                symbol, text_color = "", "black"
+
+            index = row * 8 + col
+            state = (color, symbol, text_color)
+            previous = shown[index]
+            if state == previous:
+                continue
+            if previous[0] != color:
+                canvas.itemconfig(squares[index], fill=color)
+            if previous[1:] != state[1:]:
+                canvas.itemconfig(texts[index], text=symbol, fill=text_color)
+            shown[index] = state
+
+# Canvas items of both boards, created once
+board_items = {canvas1: create_board_items(canvas1), canvas2: create_board_items(canvas2)}
 
 # Update boards and display messages
 def update_boards(highlighted_moves=None):
@@ -110,21 +146,23 @@ def board_click(event, board, canvas):
         # Select piece
         selected_piece = board[row][col]
         current_board = board  # Save the current board
-        if selected_piece and selected_piece.color == "White":
-            info_label.config(text=f"🔹 Selected piece: {selected_piece.piece_type} at position ({row}, {col}).")
-            highlighted_moves = selected_piece.legal_moves(board1, board2)
+        if selected_piece and selected_piece.color == WHITE:
+            info_label.config(text=f"🔹 Selected piece: {TYPE_NAMES[selected_piece.piece_type]} at position ({row}, {col}).")
+            highlighted_moves = [move for piece, move in movegen.generate_legal_moves(pieces.board, WHITE)
+                                 if piece is selected_piece]
             update_boards(highlighted_moves)  # Highlight moves
         else:
             info_label.config(text="⚠️ No selectable piece at that position.")
             selected_piece = None
     else:
         # Attempt to move the piece
+        # The capture happens on the board the piece stands on
+        captured = (board2 if selected_piece.dimension == 2 else board1)[row][col]
         if (row, col) in highlighted_moves and pieces.move(selected_piece, (row, col)):
-            captured = pieces.move(selected_piece, (row, col))
             if captured:
                 info_label.config(text=f"🗑️ Captured piece: {PIECE_SYMBOLS[captured.piece_type][captured.color]} removed from the board.")
             else:
-                info_label.config(text=f"✅ Moving {selected_piece.piece_type} to position ({row}, {col}) on board "
+                info_label.config(text=f"✅ Moving {TYPE_NAMES[selected_piece.piece_type]} to position ({row}, {col}) on board "
                                        f"{'1' if board is board1 else '2'}.")
             selected_piece = None  # Reset selection
             highlighted_moves = []  # Clear highlighted moves
@@ -139,27 +177,75 @@ def board_click(event, board, canvas):
 
 
 # Robot's turn
+search_thread = None  # Thread of the robot's search, while it runs
+search_updates = queue.Queue()  # Messages from the search thread to the event loop
+
 def robot_turn():
-    # Logic for the robot's turn. Plays on both boards.
+    # Starts the robot's move. Book moves and answers found while pondering are played at once; otherwise the
+    # engine searches a copy of the board in a worker thread, so the window keeps answering, and poll_search picks
+    # up its progress and its move.
 
-    global white_turn
+    global search_thread
     info_label.config(text="\n🤖 Robot's turn...")
 
-    # Determine possible moves on both boards
-    best_move_1 = semi_random_move(board1)
-    best_move_2 = semi_random_move(board2)
+    app.stop_pondering()
+    ready_move = book.probe(pieces.board) or app.pondered_move(pieces.board)
+    if ready_move:
+        finish_robot_turn(ready_move)
+        return
+
+    search_board = pieces.board.create_copy()
+
+    def report(depth, score, best_move, nodes, seconds):
+        search_updates.put(("progress", depth, notation.move_text(*best_move), nodes / max(seconds, 1e-3)))
+
+    def search():
+        best_move, _ = app.find_best_move(on_iteration=report, board=search_board)
+        search_updates.put(("done", search_board.encode_move(*best_move) if best_move else 0))
+
+    app.search_stop = False
+    stop_button.config(state="normal")
+    search_thread = threading.Thread(target=search, daemon=True)
+    search_thread.start()
+    root.after(SEARCH_POLL_MS, poll_search)
+
+def poll_search():
+    # Shows the progress of the robot's search and plays its move once it is done. The move comes back encoded,
+    # because the search ran on a copy of the board.
+
+    global search_thread
+    while True:
+        try:
+            update = search_updates.get_nowait()
+        except queue.Empty:
+            break
+        if update[0] == "progress":
+            _, depth, best_move, speed = update
+            info_label.config(text=f"🤖 Robot thinking: depth {depth}, best move {best_move}, {speed:.0f} nodes/s")
+        else:
+            search_thread.join()
+            search_thread = None
+            stop_button.config(state="disabled")
+            finish_robot_turn(pieces.board.decode_move(update[1]) if update[1] else None)
+            return
+    root.after(SEARCH_POLL_MS, poll_search)
 
-    # Choose a move randomly between the two boards
-    if best_move_1 and best_move_2:
-        best_move = random.choice([best_move_1, best_move_2])
-    else:
-        best_move = best_move_1 or best_move_2
+def stop_search():
+    # Cancels the robot's search; the best move of the deepest finished iteration is played.
+
+    if search_thread is not None:
+        app.search_stop = True
+
+def finish_robot_turn(best_move):
+    # Plays the robot's move, if it has one, and gives the turn back to the player.
 
+    global white_turn
     if best_move:
-        piece, move, board = best_move
+        piece, move = best_move
+        dimension = piece.dimension  # The board the move is played on; the piece lands on the other one
         if pieces.move(piece, move):
-            info_label.config(text=f"🛠️ Robot moved {piece.piece_type} to position {move} on board "
-                                   f"{'1' if board is board1 else '2'}.")
+            info_label.config(text=f"🛠️ Robot moved {TYPE_NAMES[piece.piece_type]} to position {move} on board "
+                                   f"{dimension}.")
             update_boards()
         else:
             info_label.config(text="⚠️ Robot could not make the move.")
@@ -168,20 +254,7 @@ def robot_turn():
 
     white_turn = True  # Return the turn to the player
     info_label.config(text="🔄 White player's turn.\n")
-
-# Semi-random move for the robot
-def semi_random_move(board):
-    # Selects a semi-random move on a board.
-
-    black_pieces = [item for sublist in board for item in sublist if item and item.color == "Black"]
-    possible_moves = []
-    for piece in black_pieces:
-        moves = piece.legal_moves(board1, board2)
-        for move in moves:
-            possible_moves.append((piece, move, board))
-    if possible_moves:
-        return random.choice(possible_moves)
-    return None
+    app.start_pondering(pieces.board)  # Search the answers to the player's likely moves meanwhile
 
 # Bind clicks to boards
 canvas1.bind("<Button-1>", lambda event: board_click(event, board1, canvas1))
@@ -189,6 +262,7 @@ canvas2.bind("<Button-1>", lambda event: board_click(event, board2, canvas2))
 
 # Draw the boards initially
 update_boards()
+app.start_pondering(pieces.board)
 
 # Run the main loop
 root.mainloop()
@@ -0,0 +1,150 @@
+'''
+analysis.py
+Offline analysis of many positions. The positions are read one at a time, either as text in the notation of
+notation.py (one per line; empty lines and lines starting with "#" are skipped) or as a file of packed positions,
+and handed to a pool of worker processes, each one with its own copy of the engine of app.py. Every position gets
+the same depth, time or node limit and is searched with an empty transposition table, so its result does not depend
+on the positions before it.
+
+The results are written as JSON lines in the order of the input, one per position:
+    {"index": 0, "position": "...", "bestmove": "1e2e4", "score": 35, "score_text": "cp 35", "depth": 4,
+     "pv": "1e2e4 1d7d5", "nodes": 12000, "seconds": 1.52}
+"score" is from White's side, as in app.py, and "score_text" from the side to move, as in uci.py. A position without
+legal moves has "bestmove": null and "result": "checkmate" or "stalemate"; one that cannot be read has "error".
+
+Only a bounded number of positions is in flight at any time (IN_FLIGHT per worker), so the memory used does not
+grow with the size of the input.
+
+    python analysis.py positions.txt --depth 4 --output results.jsonl
+    python analysis.py positions.bin --packed --time 0.5 --workers 4
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+import app
+import notation
+import pieces
+import uci
+from transposition import TranspositionTable
+
+WORKERS = os.cpu_count() or 1
+IN_FLIGHT = 4  # Positions queued per worker; more only uses memory, fewer may leave a worker idle
+HASH_MB = 1  # Table of each worker, cleared before every position, so small enough to clear in a fraction of a search
+
+def _start_worker(tt_size_mb):
+    # Pool initializer: every worker searches with its own table of tt_size_mb megabytes.
+
+    app.transposition_table = TranspositionTable(tt_size_mb)
+
+def read_positions(path, packed=False):
+    # Yields the positions of a file, as text lines or as packed records, without reading the whole file.
+
+    if packed:
+        with open(path, "rb") as packed_file:
+            yield from notation.read_packed(packed_file)
+        return
+    with open(path) as text_file:
+        for line in text_file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+def analyze_position(index, position, time_limit, max_depth, node_limit):
+    # Searches one position, given as text or packed, in the current process. Returns its result as a dict.
+
+    result = {"index": index}
+    try:
+        if isinstance(position, bytes):
+            board = notation.unpack_position(position)
+        else:
+            board = notation.parse_position(position)
+    except ValueError as error:
+        result["position"] = position if isinstance(position, str) else position.hex()
+        result["error"] = str(error)
+        return result
+    result["position"] = notation.position_text(board)
+
+    pieces.set_board(board)
+    app.transposition_table.clear()
+    color = board.side_to_move
+    started = time.perf_counter()
+    best_move, stats = app.find_best_move(time_limit, node_limit, max_depth)
+    seconds = time.perf_counter() - started
+    if best_move is None:
+        result["bestmove"] = None
+        result["result"] = "checkmate" if board.in_check(color) else "stalemate"
+        return result
+
+    score = stats.score
+    line = app.principal_variation(board, stats.depth) or [best_move]
+    if line[0] != best_move:
+        line = [best_move]
+    result.update({
+        "bestmove": notation.move_text(*best_move),
+        "score": score,
+        "score_text": uci.score_text(score, color) if score is not None else None,
+        "depth": stats.depth,
+        "pv": notation.line_text(board, line),
+        "nodes": stats.nodes,
+        "seconds": round(seconds, 3),
+    })
+    return result
+
+def analyze(positions, workers=WORKERS, time_limit=None, max_depth=4, node_limit=None, in_flight=IN_FLIGHT,
+            tt_size_mb=HASH_MB):
+    # Yields the result of every position in input order, while at most workers * in_flight positions are queued or
+    # being searched.
+
+    pending = deque()
+    with multiprocessing.Pool(workers, initializer=_start_worker, initargs=(tt_size_mb,)) as pool:
+        for index, position in enumerate(positions):
+            pending.append(pool.apply_async(analyze_position, (index, position, time_limit, max_depth, node_limit)))
+            if len(pending) >= workers * in_flight:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze a file of positions over a process pool.")
+    parser.add_argument("positions", help="file of positions, one per line, or packed with --packed")
+    parser.add_argument("--packed", action="store_true", help="the file holds packed positions")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes")
+    parser.add_argument("--time", type=float, default=None, help="seconds per position")
+    parser.add_argument("--depth", type=int, default=None,
+                        help="depth per position (default 4 without --time or --nodes)")
+    parser.add_argument("--nodes", type=int, default=None, help="nodes per position")
+    parser.add_argument("--hash", type=int, default=HASH_MB, help="transposition table size of each worker in MB")
+    parser.add_argument("--output", default=None, help="file for the results (default standard output)")
+    arguments = parser.parse_args()
+
+    max_depth = arguments.depth or (app.MAX_DEPTH if arguments.time or arguments.nodes else 4)
+    output = open(arguments.output, "w") if arguments.output else sys.stdout
+    analyzed = nodes = 0
+    started = time.perf_counter()
+    try:
+        for result in analyze(read_positions(arguments.positions, arguments.packed), arguments.workers,
+                              arguments.time, max_depth, arguments.nodes, tt_size_mb=arguments.hash):
+            output.write(json.dumps(result) + "\n")
+            analyzed += 1
+            nodes += result.get("nodes", 0)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - started
+    print(f"{analyzed} positions in {elapsed:.1f}s ({nodes / elapsed if elapsed else 0:.0f} nodes/s)",
+          file=sys.stderr)
@@ -12,187 +12,575 @@ Course:         Artificial Intelligence
 Date:           2024 December
 '''
 
+import json
+import threading
 import time
 import os
+import book
+import movegen
 import pieces
-import random
+from board import BLACK, PIECE_SCALE, TYPE_NAMES, WHITE
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
 
 # Initialize pieces
 pieces.initialize_pieces()
 
-# Create lists of white and black pieces
-white_pieces = [item for row in pieces.board.white_board for item in row if item and item.color == "White"]
-white_pieces.extend(item for row in pieces.board.black_board for item in row if item and item.color == "White")
-black_pieces = [item for row in pieces.board.black_board for item in row if item and item.color == "Black"]
-black_pieces.extend(item for row in pieces.board.white_board for item in row if item and item.color == "Black")
-
-# Cost table for positional evaluation
-cost_table = [
-    [50, 30, 30, 30, 30, 30, 30, 50],
-    [30, 20, 20, 20, 20, 20, 20, 30],
-    [30, 20, 10, 10, 10, 10, 20, 30],
-    [30, 20, 10,  0,  0, 10, 20, 30],
-    [30, 20, 10,  0,  0, 10, 20, 30],
-    [30, 20, 10, 10, 10, 10, 20, 30],
-    [30, 20, 20, 20, 20, 20, 20, 30],
-    [50, 30, 30, 30, 30, 30, 30, 50]
-]
+# Search configuration
+INFINITY = 1000000
+MATE_SCORE = 100000  # Score of a checkmate at the root; mates further away score less, so the shortest is preferred
+TT_SIZE_MB = 16
+TIME_LIMIT = 2.0  # Seconds per machine move
+NODE_LIMIT = None  # Nodes per machine move, None for no limit
+MAX_DEPTH = 32
+CHECK_EVERY = 16  # Nodes between two clock checks, a few milliseconds at the speed of this engine
+PONDER_WIDTH = 8  # Replies of the opponent searched while pondering, the expected one first
+PONDER_MIN_DEPTH = 4  # A pondered answer is played at once only if it was searched at least this deep
+# JSON lines file where main() appends the statistics of every machine search; only set through the environment
+STATS_LOG = os.environ.get("ALICE_STATS_LOG")
+transposition_table = TranspositionTable(TT_SIZE_MB)
+
+# Move ordering
+MAX_PLY = 64
+HASH_MOVE_ORDER = 1 << 30
+CAPTURE_ORDER = 1 << 28
+KILLER_ORDER = 1 << 27
+HISTORY_LIMIT = 1 << 26  # History scores are halved when one reaches this, so they stay below the killers
+DELTA_MARGIN = 200  # Positional swing allowed on top of the captured material before a capture is pruned
+
+# Budget and heuristics of the running search
+nodes_searched = 0
+search_deadline = None
+search_node_limit = None
+search_root_moves = 0  # Length of the board's undo stack at the root, to know the ply of a node
+search_stop = False  # Set from another thread to end the running search as if its budget had run out
+ponder_thread = None
+ponder_cache = {}  # Zobrist hash of a position after an opponent's reply -> (depth, encoded best answer)
+
+# Counters of the running search, read into a SearchStats (see current_stats) at the end of every iteration
+quiescence_nodes = 0
+beta_cutoffs = 0
+first_move_cutoffs = 0
+tt_probes = 0
+tt_hits = 0
+selective_depth = 0
+killer_moves = [[0, 0] for _ in range(MAX_PLY)]
+history_table = [[0] * 8192 for _ in range(2)]  # history_table[color][encoded move]
+
+class SearchTimeout(Exception):
+    # Raised from inside the search when the time or node budget of the move runs out.
+    pass
+
+class SearchStats:
+    # What one search did, counted from its start: nodes (quiescence included), beta cutoffs of minimax and how
+    # many came from the first move tried, transposition table probes and hits of minimax, the deepest ply reached
+    # and the time taken, with the depth and score of the deepest completed iteration. find_best_move returns one
+    # for the whole search, which counts the unfinished iteration too, with one per completed iteration in
+    # `iterations`.
+
+    __slots__ = ("depth", "score", "nodes", "quiescence_nodes", "beta_cutoffs", "first_move_cutoffs", "tt_probes",
+                 "tt_hits", "selective_depth", "elapsed", "iterations")
+
+    def __init__(self, depth=0, score=None, elapsed=0.0, nodes=0, quiescence_nodes=0, beta_cutoffs=0,
+                 first_move_cutoffs=0, tt_probes=0, tt_hits=0, selective_depth=0):
+        self.depth = depth
+        self.score = score
+        self.nodes = nodes
+        self.quiescence_nodes = quiescence_nodes
+        self.beta_cutoffs = beta_cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+        self.tt_probes = tt_probes
+        self.tt_hits = tt_hits
+        self.selective_depth = selective_depth
+        self.elapsed = elapsed
+        self.iterations = []
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        values = {name: getattr(self, name) for name in self.__slots__ if name != "iterations"}
+        values["first_move_cutoff_rate"] = round(self.first_move_cutoff_rate, 4)
+        values["tt_hit_rate"] = round(self.tt_hit_rate, 4)
+        values["nodes_per_second"] = round(self.nodes_per_second)
+        values["elapsed"] = round(self.elapsed, 4)
+        if self.iterations:
+            values["iterations"] = [iteration.as_dict() for iteration in self.iterations]
+        return values
+
+    def __str__(self):
+        return (f"depth {self.depth}/{self.selective_depth}, {self.nodes} nodes ({self.quiescence_nodes} quiescence) "
+                f"in {self.elapsed:.2f}s, {self.nodes_per_second:.0f} nodes/s, "
+                f"{self.first_move_cutoff_rate:.0%} first move cutoffs, {self.tt_hit_rate:.0%} hash hits")
+
+def current_stats(depth, score, elapsed):
+    # SearchStats with the counters of the running search.
+
+    return SearchStats(depth, score, elapsed, nodes_searched, quiescence_nodes, beta_cutoffs, first_move_cutoffs,
+                       tt_probes, tt_hits, selective_depth)
 
 def get_legal_moves(piece):
     # Get all legal moves for a given piece, formatted as a list of details.
 
-    moves = piece.legal_moves(pieces.board.white_board, pieces.board.black_board)
-    return [[piece.piece_type, piece.position, piece.color, move, piece.dimension] for move in moves]
+    moves = [move for candidate, move in movegen.generate_legal_moves(pieces.board, piece.color) if candidate is piece]
+    return [[TYPE_NAMES[piece.piece_type], piece.position, piece.color, move, piece.dimension] for move in moves]
 
-def select_piece(position, pieces_list):
-    # Find a piece at the specified position in the given list of pieces.
+def select_piece(position, color):
+    # Find the piece of the given color at the specified position, on either board.
 
     row, col = int(position[0]), int(position[1])
-    for piece in pieces_list:
-        if piece.position == (row, col):
-            return piece
-    return None
+    return pieces.board.find_piece((row, col), color)
 
 def move_piece(piece, new_position):
     # Move a piece to a new position.
 
     return pieces.move(piece, new_position)
 
-def evaluate_board():
-    # Evaluate the board's current state using a heuristic function.
-
-    score = 0
-    for row in pieces.board.white_board:
-        for piece in row:
-            if piece:
-                base_value = piece.value
-                center_control = cost_table[piece.position[0]][piece.position[1]]
-                mobility = len(piece.legal_moves(pieces.board.white_board, pieces.board.black_board))
-                if piece.color == "White":
-                    score -= base_value + center_control + mobility
-                else:
-                    score += base_value + center_control + mobility
+def evaluate_board(board):
+    # Evaluate the board's current state. Positive scores favor White. The board keeps material, square costs and
+    # mobility of both dimensions up to date on every move and undo, so no square is scanned here.
+
+    return board.evaluate()
+
+def generate_candidate_moves(board, color):
+    # List the (piece, move) pairs the search explores for one side: the legal moves, castling included. No move
+    # leaves the king in check, so kings are never captured and a side without moves is mated or stalemated.
+
+    return movegen.generate_legal_moves(board, color)
+
+def terminal_score(board, ply):
+    # Score of a position without legal moves: checkmate (a loss for the side to move, worse the sooner it comes)
+    # or stalemate (a draw).
+
+    color = board.side_to_move
+    if not board.in_check(color):
+        return 0
+    return -(MATE_SCORE - ply) if color == WHITE else MATE_SCORE - ply
+
+def score_to_table(score, ply):
+    # Mate scores count the plies from the root, but a stored position can come back at another ply or in a later
+    # search: the table keeps them counted from the node itself.
+
+    if score > MATE_SCORE - MAX_PLY:
+        return score + ply
+    if score < -(MATE_SCORE - MAX_PLY):
+        return score - ply
     return score
 
+def score_from_table(score, ply):
+    # Inverse of score_to_table for a node at `ply`.
+
+    if score > MATE_SCORE - MAX_PLY:
+        return score - ply
+    if score < -(MATE_SCORE - MAX_PLY):
+        return score + ply
+    return score
+
+def order_moves(board, candidates, hash_move, ply):
+    # Sorts the moves of the whole position, not piece by piece: the transposition table move first, then captures
+    # on either board by most valuable victim / least valuable attacker, then the killer moves of this ply, then the
+    # quiet moves by their history score. Nothing is dropped.
+
+    killers = killer_moves[ply] if ply < MAX_PLY else ()
+    history = history_table[board.side_to_move]
+    scored = []
+    for piece, move in candidates:
+        code = board.encode_move(piece, move)
+        target = (board.black_board if piece.dimension == 2 else board.white_board)[move[0]][move[1]]
+        if code == hash_move:
+            order = HASH_MOVE_ORDER
+        elif target:
+            order = CAPTURE_ORDER + target.value * PIECE_SCALE - piece.value
+        elif code in killers:
+            order = KILLER_ORDER - killers.index(code)
+        else:
+            order = history[code]
+        scored.append((order, piece, move))
+    scored.sort(key=lambda entry: entry[0], reverse=True)
+    return [(piece, move) for _, piece, move in scored]
+
+def record_cutoff(board, piece, move, depth, ply):
+    # A quiet move caused a beta cutoff: remember it as a killer of this ply and reward it in the history table.
+
+    code = board.encode_move(piece, move)
+    if ply < MAX_PLY and killer_moves[ply][0] != code:
+        killer_moves[ply][1] = killer_moves[ply][0]
+        killer_moves[ply][0] = code
+    history = history_table[board.side_to_move]
+    history[code] += depth * depth
+    if history[code] >= HISTORY_LIMIT:
+        for index in range(len(history)):
+            history[index] >>= 1
+
 def minimax(board, depth, alpha, beta, maximizing):
-    # Minimax algorithm with alpha-beta pruning.
+    # Minimax algorithm with alpha-beta pruning. White maximizes, Black minimizes. Every move is applied on the
+    # board with make_move and taken back with unmake_move, so no copies are made. Results are kept in the
+    # transposition table, keyed by the board's Zobrist hash. The moves come from movegen.staged_moves, so after an
+    # early cutoff the quiet moves are never generated.
+
+    global nodes_searched
+    nodes_searched += 1
+    if nodes_searched % CHECK_EVERY == 0 or search_node_limit is not None:
+        check_budget()
 
     if depth == 0:
-        return evaluate_board() + random.uniform(-0.5, 0.5)
-
-    if maximizing:
-        max_eval = -float('inf')
-        for piece in white_pieces:
-            moves = piece.legal_moves(board.white_board, board.black_board)
-            moves = filter_promising_moves(piece, moves)
-            for move in moves:
-                board_copy = board.create_copy()
-                pieces.move(piece, move, simulate=True)
-                eval_score = minimax(board_copy, depth - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-        return max_eval
+        return quiescence(board, alpha, beta, maximizing)
+
+    global tt_probes, tt_hits, beta_cutoffs, first_move_cutoffs, selective_depth
+    alpha_original, beta_original = alpha, beta
+    ply = len(board.undo_stack) - search_root_moves
+    hash_move = 0
+    tt_probes += 1
+    entry = transposition_table.probe(board.hash)
+    if entry:
+        tt_hits += 1
+        entry_depth, entry_score, bound, hash_move = entry
+        entry_score = score_from_table(entry_score, ply)
+        if entry_depth >= depth:
+            if bound == EXACT:
+                return entry_score
+            if bound == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if beta <= alpha:
+                return entry_score
+
+    if ply > selective_depth:
+        selective_depth = ply
+    color = WHITE if maximizing else BLACK
+    killers = tuple(killer_moves[ply]) if ply < MAX_PLY else ()
+    best_score = -INFINITY if maximizing else INFINITY
+    best_move = 0
+    searched = 0
+    for piece, move in movegen.staged_moves(board, color, hash_move, killers, history_table[color]):
+        searched += 1
+        captured = board.make_move(piece, move)
+        eval_score = minimax(board, depth - 1, alpha, beta, not maximizing)
+        board.unmake_move()
+        if maximizing:
+            if eval_score > best_score:
+                best_score, best_move = eval_score, board.encode_move(piece, move)
+            alpha = max(alpha, eval_score)
+        else:
+            if eval_score < best_score:
+                best_score, best_move = eval_score, board.encode_move(piece, move)
+            beta = min(beta, eval_score)
+        if beta <= alpha:
+            beta_cutoffs += 1
+            if searched == 1:
+                first_move_cutoffs += 1
+            if not captured:
+                record_cutoff(board, piece, move, depth, ply)
+            break
+
+    if not searched:
+        return terminal_score(board, ply)
+    if best_score <= alpha_original:
+        bound = UPPER_BOUND
+    elif best_score >= beta_original:
+        bound = LOWER_BOUND
     else:
-        min_eval = float('inf')
-        for piece in black_pieces:
-            moves = piece.legal_moves(board.white_board, board.black_board)
-            moves = filter_promising_moves(piece, moves)
-            for move in moves:
-                board_copy = board.create_copy()
-                pieces.move(piece, move, simulate=True)
-                eval_score = minimax(board_copy, depth - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-        return min_eval
-
-def find_best_move():
-    # Find the best move for the black pieces using Minimax.
-
-    best_moves = []
-    best_score = float('inf')
-    for piece in black_pieces:
-        moves = piece.legal_moves(pieces.board.white_board, pieces.board.black_board)
-        moves = filter_promising_moves(piece, moves)
-        for move in moves:
-            board_copy = pieces.board.create_copy()
-            pieces.move(piece, move, simulate=True)
-            score = minimax(board_copy, 2, -float('inf'), float('inf'), True)
-            if score < best_score:
-                best_score = score
-                best_moves = [(piece, move)]
-            elif score == best_score:
-                best_moves.append((piece, move))
-    return random.choice(best_moves) if best_moves else None
-
-def filter_promising_moves(piece, moves, max_count=5):
-    # Filter and sort moves to prioritize promising ones, such as captures or center moves.
-
-    sorted_moves = sorted(moves, key=lambda move: cost_table[move[0]][move[1]], reverse=True)
-    return sorted_moves[:max_count]
-
-def semi_random_move():
-    # Select a semi-random move for the black pieces.
-
-    possible_moves = []
-    for piece in black_pieces:
-        moves = piece.legal_moves(pieces.board.white_board, pieces.board.black_board)
-        for move in moves:
-            possible_moves.append((piece, move))
-    return random.choice(possible_moves) if possible_moves else None
-
-# Main game loop
-SEMI_RANDOM_TURNS = 5
-current_turn = 0
-white_turn = True
-
-while not pieces.end_game():
-    os.system("cls")
-    pieces.display_board()
+        bound = EXACT
+    transposition_table.store(board.hash, depth, score_to_table(best_score, ply), bound, best_move)
+    return best_score
 
-    if white_turn:
-        while True:
-            if pieces.is_check():
-                time.sleep(1)
-            try:
-                position = input("Enter the position of the piece to move (e.g., '12'): ")
-                row, col = int(position[0]), int(position[1])
-            except ValueError:
-                print("Error: Please enter a valid position.")
+def quiescence(board, alpha, beta, maximizing):
+    # Extends the leaves of minimax until the position is quiet. Unless the side to move is in check, it may stand
+    # pat on the static evaluation and only tries captures; a capture sends the capturing piece to the other board
+    # like any other Alice move. Captures that cannot bring the score back to the window even with a margin are
+    # skipped (delta pruning). In check, every move is tried so the evasions are seen.
+
+    global nodes_searched, quiescence_nodes, selective_depth
+    nodes_searched += 1
+    quiescence_nodes += 1
+    if nodes_searched % CHECK_EVERY == 0 or search_node_limit is not None:
+        check_budget()
+
+    color = board.side_to_move
+    ply = len(board.undo_stack) - search_root_moves
+    if ply > selective_depth:
+        selective_depth = ply
+    in_check = ply < MAX_PLY and board.in_check(color)
+    if in_check:
+        stand_pat = None
+        best_score = -INFINITY if maximizing else INFINITY
+        candidates = generate_candidate_moves(board, color)
+        if not candidates:
+            return terminal_score(board, ply)
+    else:
+        stand_pat = best_score = evaluate_board(board)
+        if maximizing:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+        else:
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+        if ply >= MAX_PLY:
+            return stand_pat
+        candidates = movegen.generate_legal_moves(board, color, captures_only=True)
+
+    for piece, move in order_moves(board, candidates, 0, ply):
+        if stand_pat is not None:
+            victim = (board.black_board if piece.dimension == 2 else board.white_board)[move[0]][move[1]]
+            gain = victim.value * PIECE_SCALE + DELTA_MARGIN
+            if maximizing and stand_pat + gain <= alpha or not maximizing and stand_pat - gain >= beta:
                 continue
-            piece = select_piece((row, col), white_pieces)
-            if piece:
-                moves = get_legal_moves(piece)
-                if moves:
-                    print("Possible moves: ", [move[3] for move in moves])
-                    try:
-                        new_position = input("Enter the new position (e.g., '12'): ")
-                        row, col = int(new_position[0]), int(new_position[1])
-                    except ValueError:
-                        print("Error: Please enter a valid position.")
-                        continue
-                    if move_piece(piece, (row, col)):
-                        print(f"Piece moved to {(row, col)}")
-                        break
+        board.make_move(piece, move)
+        score = quiescence(board, alpha, beta, not maximizing)
+        board.unmake_move()
+        if maximizing:
+            best_score = max(best_score, score)
+            alpha = max(alpha, score)
+        else:
+            best_score = min(best_score, score)
+            beta = min(beta, score)
+        if beta <= alpha:
+            break
+
+    if best_score in (INFINITY, -INFINITY):
+        return evaluate_board(board)
+    return best_score
+
+def check_budget():
+    # Stops the search when the clock or the node counter goes past the budget of the move.
+
+    if search_stop:
+        raise SearchTimeout()
+    if search_deadline is not None and time.perf_counter() >= search_deadline:
+        raise SearchTimeout()
+    if search_node_limit is not None and nodes_searched >= search_node_limit:
+        raise SearchTimeout()
+
+def search_root(board, depth, candidates, maximizing):
+    # Searches every root move to the given depth, in the given order. Returns (best score, best move).
+
+    alpha, beta = -INFINITY, INFINITY
+    best_score = -INFINITY if maximizing else INFINITY
+    best_move = None
+    for piece, move in candidates:
+        board.make_move(piece, move)
+        score = minimax(board, depth - 1, alpha, beta, not maximizing)
+        board.unmake_move()
+        if maximizing and score > best_score or not maximizing and score < best_score or best_move is None:
+            best_score, best_move = score, (piece, move)
+        if maximizing:
+            alpha = max(alpha, score)
+        else:
+            beta = min(beta, score)
+    # The root is ply 0, where scores counted from the root and from the node are the same
+    transposition_table.store(board.hash, depth, best_score, EXACT, board.encode_move(*best_move))
+    return best_score, best_move
+
+def find_best_move(time_limit=TIME_LIMIT, node_limit=NODE_LIMIT, max_depth=MAX_DEPTH, start_depth=1,
+                   on_iteration=None, board=None):
+    # Find the best move for the side to move with iterative deepening: depth 1, 2, 3... until the time or node
+    # budget runs out. Each iteration tries the previous best move first. When the budget runs out mid-iteration,
+    # that iteration is thrown away and the best move of the deepest completed one is returned. Returns
+    # (best move, SearchStats), the move being None if the side to move has no legal moves; the depth and score of
+    # the move are those of the stats. on_iteration(depth, score, best move, nodes, seconds) is called after every
+    # completed iteration. The game board is searched unless another board (such as a copy) is given.
+
+    global nodes_searched, search_deadline, search_node_limit, search_root_moves
+    global quiescence_nodes, beta_cutoffs, first_move_cutoffs, tt_probes, tt_hits, selective_depth
+    if board is None:
+        board = pieces.board
+    maximizing = board.side_to_move == WHITE
+    start = time.perf_counter()
+    nodes_searched = quiescence_nodes = beta_cutoffs = first_move_cutoffs = tt_probes = tt_hits = selective_depth = 0
+    candidates = generate_candidate_moves(board, board.side_to_move)
+    if not candidates:
+        return None, current_stats(0, None, time.perf_counter() - start)
+
+    transposition_table.new_search()
+    iterations = []
+    search_deadline = start + time_limit if time_limit is not None else None
+    search_node_limit = node_limit
+    root_moves = search_root_moves = len(board.undo_stack)
+    for killers in killer_moves:
+        killers[0] = killers[1] = 0
+    for history in history_table:
+        for index in range(len(history)):
+            history[index] >>= 2
+    entry = transposition_table.probe(board.hash)
+    candidates = order_moves(board, candidates, entry[3] if entry else 0, 0)
+    best_move = candidates[0]
+    completed_depth, best_score = 0, None
+    try:
+        for depth in range(start_depth, max_depth + 1):
+            best_score, best_move = search_root(board, depth, candidates, maximizing)
+            completed_depth = depth
+            iterations.append(current_stats(depth, best_score, time.perf_counter() - start))
+            if on_iteration is not None:
+                on_iteration(depth, best_score, best_move, nodes_searched, time.perf_counter() - start)
+            candidates.remove(best_move)
+            candidates.insert(0, best_move)
+            # The next iteration takes several times longer than this one: do not start what cannot finish
+            if time_limit is not None and time.perf_counter() - start > time_limit / 2:
+                break
+    except SearchTimeout:
+        while len(board.undo_stack) > root_moves:
+            board.unmake_move()
+    finally:
+        search_deadline = search_node_limit = None
+    stats = current_stats(completed_depth, best_score, time.perf_counter() - start)
+    stats.iterations = iterations
+    return best_move, stats
+
+def log_search_stats(stats, path, **fields):
+    # Appends the statistics of a search to a JSON lines file, one search per line, together with any extra fields
+    # given (such as the move played).
+
+    record = {"time": round(time.time(), 3), **fields, **stats.as_dict()}
+    with open(path, "a") as log_file:
+        log_file.write(json.dumps(record) + "\n")
+
+def ponder(board):
+    # Body of the pondering thread. `board` is a private copy of the game, with the opponent to move. Its likely
+    # replies (the expected one from the transposition table first, then the rest in search order) are played one
+    # by one and the answer to each is searched, one more ply per round, so every reply gets a shallow answer before
+    # any gets a deep one. Answers go to ponder_cache and the searched positions stay in the transposition table.
+
+    replies = generate_candidate_moves(board, board.side_to_move)
+    entry = transposition_table.probe(board.hash)
+    replies = order_moves(board, replies, entry[3] if entry else 0, 0)[:PONDER_WIDTH]
+    for depth in range(1, MAX_DEPTH + 1):
+        for piece, move in replies:
+            if search_stop:
+                return
+            board.make_move(piece, move)
+            best_move, stats = find_best_move(None, None, depth, start_depth=depth, board=board)
+            if best_move is not None and stats.depth == depth:
+                ponder_cache[board.hash] = (depth, board.encode_move(*best_move))
+            board.unmake_move()
+
+def start_pondering(board):
+    # Starts searching the answers to the opponent's likely moves in the background while the opponent thinks.
+    # stop_pondering has to be called before any other search, since they share the search state.
+
+    global ponder_thread, search_stop
+    stop_pondering()
+    ponder_cache.clear()
+    search_stop = False
+    ponder_thread = threading.Thread(target=ponder, args=(board.create_copy(),), daemon=True)
+    ponder_thread.start()
+
+def stop_pondering():
+    # Ends the pondering thread, if any, and waits for it.
+
+    global ponder_thread, search_stop
+    if ponder_thread is not None:
+        search_stop = True
+        ponder_thread.join()
+        ponder_thread = None
+        search_stop = False
+
+def pondered_move(board, min_depth=PONDER_MIN_DEPTH):
+    # The answer found while pondering for the current position, if it was searched at least min_depth deep.
+    # Returns (piece, position), or None.
+
+    depth, code = ponder_cache.get(board.hash, (0, 0))
+    if depth < min_depth:
+        return None
+    move = board.decode_move(code)
+    return move if move in generate_candidate_moves(board, board.side_to_move) else None
+
+def principal_variation(board, max_length=MAX_DEPTH):
+    # Expected line of play from the position, following the moves stored in the transposition table. Stops at the
+    # first position without a stored move, at an illegal move (a hash collision) or at a repeated position.
+
+    line = []
+    seen = set()
+    while len(line) < max_length and board.hash not in seen:
+        seen.add(board.hash)
+        entry = transposition_table.probe(board.hash)
+        move = board.decode_move(entry[3]) if entry and entry[3] else None
+        if move is None or move not in generate_candidate_moves(board, board.side_to_move):
+            break
+        board.make_move(*move)
+        line.append(move)
+    for _ in line:
+        board.unmake_move()
+    return line
+
+def main():
+    # Main game loop
+
+    current_turn = 0
+    white_turn = True
+    last_message = ""
+
+    while not pieces.end_game():
+        os.system("cls")
+        pieces.display_board()
+        print(last_message)
+
+        if white_turn:
+            if pieces.is_check():
+                print("Your king is in check.")
+            # The machine searches its answers to the likely moves while the player thinks
+            start_pondering(pieces.board)
+            while True:
+                try:
+                    position = input("Enter the position of the piece to move (e.g., '12'): ")
+                    row, col = int(position[0]), int(position[1])
+                except ValueError:
+                    print("Error: Please enter a valid position.")
+                    continue
+                piece = select_piece((row, col), WHITE)
+                if piece:
+                    moves = get_legal_moves(piece)
+                    if moves:
+                        print("Possible moves: ", [move[3] for move in moves])
+                        try:
+                            new_position = input("Enter the new position (e.g., '12'): ")
+                            row, col = int(new_position[0]), int(new_position[1])
+                        except ValueError:
+                            print("Error: Please enter a valid position.")
+                            continue
+                        if move_piece(piece, (row, col)):
+                            print(f"Piece moved to {(row, col)}")
+                            break
+                        else:
+                            print("Invalid move.")
                     else:
-                        print("Invalid move.")
+                        print("No legal moves for this piece.")
                 else:
-                    print("No legal moves for this piece.")
-            else:
-                print("Piece not found.")
-    else:
-        print("Machine's turn.")
-        best_move = semi_random_move() if current_turn < SEMI_RANDOM_TURNS else find_best_move()
-        if best_move:
-            piece, move = best_move
-            if move_piece(piece, move):
-                print(f"Machine moved {piece.piece_type} to {move}")
-
-    current_turn += 1
-    white_turn = not white_turn
-    time.sleep(4)
-
-print("Game over.")
+                    print("Piece not found.")
+            stop_pondering()
+        else:
+            print("Machine's turn.")
+            # Opening moves come from the book while the game is in it, then from pondering if the player made a
+            # move it had searched deep enough
+            best_move = book.probe(pieces.board) or pondered_move(pieces.board)
+            searched = best_move is None
+            if searched:
+                best_move, stats = find_best_move()
+            if best_move:
+                piece, move = best_move
+                if searched and STATS_LOG:
+                    log_search_stats(stats, STATS_LOG, turn=current_turn)
+                if move_piece(piece, move):
+                    last_message = f"Machine moved {TYPE_NAMES[piece.piece_type]} to {move}"
+                    if searched:
+                        last_message += f"\nSearch: {stats}"
+
+        current_turn += 1
+        white_turn = not white_turn
+
+    pieces.display_board()
+    print("Checkmate." if pieces.is_check() else "Stalemate.")
+    print("Game over.")
+
+if __name__ == "__main__":
+    main()
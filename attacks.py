@@ -0,0 +1,139 @@
+'''
+attacks.py
+Attack and ray tables built once at import time. Squares are indexed as row * 8 + column. Every table exists in two
+forms: a tuple of (row, column) targets, used by the piece classes over the matrices, and a 64-bit mask, used by
+the BitBoard. The slider attacks of bishop_attacks and rook_attacks are filled in as they are first needed.
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+# Sliding directions as (row step, column step). The first four are the rook directions, the last four the bishop ones
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+ROOK_DIRECTIONS = [0, 1, 2, 3]
+BISHOP_DIRECTIONS = [4, 5, 6, 7]
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+# Directions that walk towards higher square indexes (the nearest blocker is the lowest bit of the ray)
+POSITIVE_DIRECTIONS = [row_step * 8 + column_step > 0 for row_step, column_step in DIRECTIONS]
+
+KNIGHT_OFFSETS = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+KING_OFFSETS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+# Pawn capture offsets per color index (0 white, moving up the rows; 1 black, moving down)
+PAWN_CAPTURE_OFFSETS = [[(1, 1), (1, -1)], [(-1, 1), (-1, -1)]]
+
+
+def _targets(row, column, offsets):
+    return tuple((row + row_step, column + column_step) for row_step, column_step in offsets
+                 if 0 <= row + row_step < 8 and 0 <= column + column_step < 8)
+
+
+def _ray(row, column, direction):
+    row_step, column_step = direction
+    squares = []
+    row, column = row + row_step, column + column_step
+    while 0 <= row < 8 and 0 <= column < 8:
+        squares.append((row, column))
+        row, column = row + row_step, column + column_step
+    return tuple(squares)
+
+
+def _mask(positions):
+    mask = 0
+    for row, column in positions:
+        mask |= 1 << (row * 8 + column)
+    return mask
+
+
+SQUARES = [(row, column) for row in range(8) for column in range(8)]
+
+KNIGHT_TARGETS = [_targets(row, column, KNIGHT_OFFSETS) for row, column in SQUARES]
+KING_TARGETS = [_targets(row, column, KING_OFFSETS) for row, column in SQUARES]
+PAWN_CAPTURE_TARGETS = [[_targets(row, column, offsets) for row, column in SQUARES] for offsets in PAWN_CAPTURE_OFFSETS]
+RAYS = [[_ray(row, column, direction) for direction in DIRECTIONS] for row, column in SQUARES]
+
+def _pushes(row, column, step, start_row):
+    distance = 2 if row == start_row else 1
+    return tuple((row + step * steps, column) for steps in range(1, distance + 1) if 0 <= row + step * steps < 8)
+
+
+# Rays of every piece from every square, in one shape for all of them: a slider walks its rays until the first
+# occupied square, a knight or king has one single-square ray per target and a pawn one ray with its pushes (two
+# squares from its starting row). PIECE_RAYS[color][piece type][square]; only the pawn rays depend on the color.
+PAWN_PUSHES = [[_pushes(row, column, step, start_row) for row, column in SQUARES]
+               for step, start_row in ((1, 1), (-1, 6))]
+_SHARED_RAYS = [[tuple((target,) for target in targets) for targets in KNIGHT_TARGETS],
+                [tuple(rays[direction] for direction in BISHOP_DIRECTIONS if rays[direction]) for rays in RAYS],
+                [tuple(rays[direction] for direction in ROOK_DIRECTIONS if rays[direction]) for rays in RAYS],
+                [tuple(rays[direction] for direction in QUEEN_DIRECTIONS if rays[direction]) for rays in RAYS],
+                [tuple((target,) for target in targets) for targets in KING_TARGETS]]
+PIECE_RAYS = [[[(pushes,) if pushes else () for pushes in color_pushes]] + _SHARED_RAYS
+              for color_pushes in PAWN_PUSHES]
+
+KNIGHT_ATTACKS = [_mask(targets) for targets in KNIGHT_TARGETS]
+KING_ATTACKS = [_mask(targets) for targets in KING_TARGETS]
+PAWN_ATTACKS = [[_mask(targets) for targets in color_targets] for color_targets in PAWN_CAPTURE_TARGETS]
+RAY_MASKS = [[_mask(ray) for ray in square_rays] for square_rays in RAYS]
+
+
+def sliding_attacks(square, occupied, directions):
+    # Mask of the squares a slider on `square` reaches: each ray is cut right after its first occupied square.
+
+    attacks = 0
+    rays = RAY_MASKS[square]
+    for direction in directions:
+        ray = rays[direction]
+        blockers = ray & occupied
+        if blockers:
+            if POSITIVE_DIRECTIONS[direction]:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= RAY_MASKS[blocker][direction]
+        attacks |= ray
+    return attacks
+
+# Squares whose occupancy decides where a bishop or rook stops: its rays without their last square, which it reaches
+# whether it is occupied or not. At most 9 squares for a bishop and 12 for a rook.
+BISHOP_BLOCKERS = [_mask(square for direction in BISHOP_DIRECTIONS for square in rays[direction][:-1]) for rays in RAYS]
+ROOK_BLOCKERS = [_mask(square for direction in ROOK_DIRECTIONS for square in rays[direction][:-1]) for rays in RAYS]
+
+# Attacks already computed, per square and occupancy of the blocker squares
+_bishop_attacks = [{} for _ in SQUARES]
+_rook_attacks = [{} for _ in SQUARES]
+
+
+def bishop_attacks(square, occupied):
+    # sliding_attacks along the bishop directions, computed once per occupancy of the blocker squares (at most 512 per
+    # square).
+
+    blockers = occupied & BISHOP_BLOCKERS[square]
+    attacks = _bishop_attacks[square].get(blockers)
+    if attacks is None:
+        attacks = _bishop_attacks[square][blockers] = sliding_attacks(square, blockers, BISHOP_DIRECTIONS)
+    return attacks
+
+
+def rook_attacks(square, occupied):
+    # sliding_attacks along the rook directions, computed once per occupancy of the blocker squares (at most 4096 per
+    # square).
+
+    blockers = occupied & ROOK_BLOCKERS[square]
+    attacks = _rook_attacks[square].get(blockers)
+    if attacks is None:
+        attacks = _rook_attacks[square][blockers] = sliding_attacks(square, blockers, ROOK_DIRECTIONS)
+    return attacks
+
+# Number of squares each piece type attacks from every square of an empty board, used as the mobility term of the
+# evaluation. MOBILITY[color][piece type][square], piece types in the order Pawn, Knight, Bishop, Rook, Queen, King.
+MOBILITY = [[[len(targets) for targets in PAWN_CAPTURE_TARGETS[color]],
+             [len(targets) for targets in KNIGHT_TARGETS],
+             [sum(len(rays[direction]) for direction in BISHOP_DIRECTIONS) for rays in RAYS],
+             [sum(len(rays[direction]) for direction in ROOK_DIRECTIONS) for rays in RAYS],
+             [sum(len(rays[direction]) for direction in QUEEN_DIRECTIONS) for rays in RAYS],
+             [len(targets) for targets in KING_TARGETS]] for color in range(2)]
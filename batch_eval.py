@@ -0,0 +1,203 @@
+'''
+batch_eval.py
+Evaluation of many positions at once with NumPy. A batch of positions is encoded as a tensor of shape
+(N, 2, 12, 8, 8): for every position, both boards, one plane per color and piece type (color * 6 + piece type) and
+the 8 x 8 squares, with a 1 where that piece stands. Material, the cost_table term and the mobility term (squares
+attacked from the square on an empty board) are then products of the planes with fixed weight tables, computed for
+the whole batch with array operations. The result is the same as Board.evaluate for every position.
+
+This is meant for offline work on large sets of positions, such as the game records written by selfplay.py or files
+of positions packed with notation.pack_position (which are encoded without creating any piece); the search keeps
+using the incremental Board.evaluate, which costs nothing per node.
+
+    python batch_eval.py games.txt --check --save positions.bin
+    python batch_eval.py --packed positions.bin
+
+NumPy is optional for the rest of the program: it is only needed when this module is used.
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import argparse
+import itertools
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import notation
+import pieces
+from attacks import MOBILITY
+from board import PIECE_SCALE, cost_table
+
+PLANES = 12  # One per color and piece type, color * 6 + piece type
+BATCH_SIZE = 4096  # Positions encoded and scored together by the command line tool
+
+_weights = None
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("batch_eval needs NumPy: pip install numpy")
+
+def weights():
+    # Weight tables of the three evaluation terms, shape (12, 64) each: the value of a piece of a plane on a square,
+    # positive for White's planes and negative for Black's. Built on the first call.
+
+    global _weights
+    _require_numpy()
+    if _weights is None:
+        sign = np.repeat(np.array([1, -1], dtype=np.int64), 6).reshape(PLANES, 1)
+        values = np.array(pieces.PIECE_VALUES * 2, dtype=np.int64).reshape(PLANES, 1)
+        material = values * PIECE_SCALE * np.ones(64, np.int64)
+        cost = np.array(cost_table, dtype=np.int64).reshape(1, 64).repeat(PLANES, axis=0)
+        mobility = np.array([MOBILITY[color][piece_type] for color in range(2) for piece_type in range(6)],
+                            dtype=np.int64)
+        _weights = (sign * material, -sign * cost, sign * mobility)
+    return _weights
+
+def encode(boards):
+    # Encodes the positions into planes of shape (N, 2, 12, 8, 8). `boards` may be any iterable, even one that
+    # yields the same board after changing it, since each board is read as soon as it is yielded.
+
+    _require_numpy()
+    indexes = ([], [], [], [], [])
+    count = 0
+    for board in boards:
+        for dimension in range(2):
+            for color in range(2):
+                for piece in board.piece_lists[dimension][color]:
+                    indexes[0].append(count)
+                    indexes[1].append(dimension)
+                    indexes[2].append(color * 6 + piece.piece_type)
+                    indexes[3].append(piece.position[0])
+                    indexes[4].append(piece.position[1])
+        count += 1
+    planes = np.zeros((count, 2, PLANES, 8, 8), dtype=np.uint8)
+    planes[indexes] = 1
+    return planes
+
+def encode_packed(data):
+    # Encodes positions packed by notation.pack_position, given as one bytes-like object of whole records, straight
+    # into planes, without creating boards or pieces.
+
+    _require_numpy()
+    records = np.frombuffer(data, dtype=np.uint8).reshape(-1, notation.POSITION_BYTES)
+    planes = np.zeros((len(records), 2, PLANES, 8, 8), dtype=np.uint8)
+    positions, squares = np.nonzero(records[:, :64])
+    codes = records[positions, squares] - 1
+    planes[positions, codes // PLANES, codes % PLANES, squares >> 3, squares & 7] = 1
+    return planes
+
+def evaluate_terms(planes):
+    # Material, square cost and mobility of every position of the batch, as three arrays of shape (N,). The terms are
+    # the same on both boards, so the planes of the two boards are added first.
+
+    material_weights, cost_weights, mobility_weights = weights()
+    counts = planes.sum(axis=1, dtype=np.int64).reshape(len(planes), PLANES, 64)
+    material = np.einsum("npk,pk->n", counts, material_weights)
+    cost = np.einsum("npk,pk->n", counts, cost_weights)
+    mobility = np.einsum("npk,pk->n", counts, mobility_weights)
+    return material, cost, mobility
+
+def evaluate(planes):
+    # Evaluation of every position of the batch, positive for White, as an array of shape (N,).
+
+    material, cost, mobility = evaluate_terms(planes)
+    return material + cost + mobility
+
+def evaluate_boards(boards):
+    return evaluate(encode(boards))
+
+def replay(records):
+    # Yields the board at every position of the game records (lines of selfplay.py), the initial position included.
+    # The same board object is yielded each time, one move further.
+
+    for line in records:
+        fields = line.split()
+        if len(fields) < 2:
+            continue
+        pieces.initialize_pieces()
+        board = pieces.board
+        yield board
+        for text in fields[2:]:
+            try:
+                board.make_move(*notation.parse_move(board, text))
+            except ValueError:
+                break
+            yield board
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate every position of game records in batches.")
+    parser.add_argument("records", nargs="+", help="game record files written by selfplay.py")
+    parser.add_argument("--packed", action="store_true", help="the files hold packed positions instead")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="positions per batch")
+    parser.add_argument("--check", action="store_true", help="compare every score with Board.evaluate")
+    parser.add_argument("--save", default=None, help="also write the positions of the game records, packed")
+    arguments = parser.parse_args()
+
+    expected = []
+    save_file = open(arguments.save, "wb") if arguments.save else None
+
+    def batches():
+        # Planes of the positions, arguments.batch at a time.
+
+        if arguments.packed:
+            for path in arguments.records:
+                with open(path, "rb") as packed_file:
+                    while True:
+                        data = packed_file.read(arguments.batch * notation.POSITION_BYTES)
+                        data = data[:len(data) - len(data) % notation.POSITION_BYTES]
+                        if not data:
+                            break
+                        if arguments.check:
+                            expected.extend(notation.unpack_position(data[offset:offset + notation.POSITION_BYTES])
+                                            .evaluate() for offset in range(0, len(data), notation.POSITION_BYTES))
+                        yield encode_packed(data)
+            return
+
+        lines = []
+        for path in arguments.records:
+            with open(path) as records_file:
+                lines.extend(records_file)
+
+        def positions():
+            for board in replay(lines):
+                if arguments.check:
+                    expected.append(board.evaluate())
+                if save_file:
+                    save_file.write(notation.pack_position(board))
+                yield board
+
+        stream = positions()
+        while True:
+            planes = encode(itertools.islice(stream, arguments.batch))
+            if not len(planes):
+                return
+            yield planes
+
+    scores = []
+    started = time.perf_counter()
+    scoring = 0.0
+    for planes in batches():
+        scoring_started = time.perf_counter()
+        scores.append(evaluate(planes))
+        scoring += time.perf_counter() - scoring_started
+    elapsed = time.perf_counter() - started
+    if save_file:
+        save_file.close()
+
+    scores = np.concatenate(scores) if scores else np.zeros(0, dtype=np.int64)
+    print(f"{len(scores)} positions in {elapsed:.2f}s, {scoring:.3f}s of them scoring "
+          f"({len(scores) / max(scoring, 1e-9):.0f} positions/s)")
+    if arguments.check:
+        mismatches = int(np.count_nonzero(scores != np.array(expected, dtype=np.int64)))
+        print(f"{mismatches} scores differ from Board.evaluate")
@@ -0,0 +1,158 @@
+'''
+BitBoard class
+Board implementation that, besides the two matrices, keeps the position as 64-bit occupancy masks: one mask per
+piece type, per color and per dimension, plus the combined masks per color and per dimension. Square (row, column)
+is bit row * 8 + column. Move generation, the Alice transfer check and the attack tests run as mask operations.
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+from board import BISHOP, KING, KNIGHT, PAWN, ROOK, Board
+from attacks import KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, bishop_attacks, rook_attacks
+
+# Pawn pushes as masks per color and square: the square in front and the one two squares ahead from the start row
+PAWN_STEPS = [[1 << (pushes[0][0] * 8 + pushes[0][1]) if pushes else 0 for pushes in color_pushes]
+              for color_pushes in PAWN_PUSHES]
+PAWN_DOUBLE_STEPS = [[1 << (pushes[1][0] * 8 + pushes[1][1]) if len(pushes) > 1 else 0 for pushes in color_pushes]
+                     for color_pushes in PAWN_PUSHES]
+
+# (row, column) positions of the bits of one byte of a mask, ROW_SQUARES[row][byte]
+ROW_SQUARES = [[tuple((row, column) for column in range(8) if byte >> column & 1) for byte in range(256)]
+               for row in range(8)]
+SQUARE_CACHE_SIZE = 1 << 16  # Masks whose positions squares_of keeps
+
+_mask_squares = {}
+
+
+def squares_of(mask):
+    # Converts a mask into a tuple of (row, column) positions, in square order. The search converts the same masks
+    # over and over, so the first SQUARE_CACHE_SIZE different masks keep their tuple.
+
+    positions = _mask_squares.get(mask)
+    if positions is None:
+        positions = ()
+        rest, row = mask, 0
+        while rest:
+            if rest & 0xFF:
+                positions += ROW_SQUARES[row][rest & 0xFF]
+            rest >>= 8
+            row += 1
+        if len(_mask_squares) < SQUARE_CACHE_SIZE:
+            _mask_squares[mask] = positions
+    return positions
+
+
+class BitBoard(Board):
+    def __init__(self):
+        super().__init__()
+        # piece_masks[dimension - 1][color][piece type], color_masks[dimension - 1][color], occupied[dimension - 1]
+        self.piece_masks = [[[0] * 6 for _ in range(2)] for _ in range(2)]
+        self.color_masks = [[0, 0], [0, 0]]
+        self.occupied = [0, 0]
+
+    def _toggle(self, piece, dimension, position):
+        # Flips the bit of a piece in every mask it belongs to.
+
+        bit = 1 << (position[0] * 8 + position[1])
+        board_index = dimension - 1
+        color = piece.color
+        self.piece_masks[board_index][color][piece.piece_type] ^= bit
+        self.color_masks[board_index][color] ^= bit
+        self.occupied[board_index] ^= bit
+
+    def _set_square(self, piece, dimension, position):
+        row, column = position
+        board = self.black_board if dimension == 2 else self.white_board
+        previous = board[row][column]
+        if previous:
+            self._toggle(previous, dimension, position)
+        super()._set_square(piece, dimension, position)
+        self._toggle(piece, dimension, position)
+
+    def _clear_square(self, dimension, position):
+        row, column = position
+        board = self.black_board if dimension == 2 else self.white_board
+        previous = board[row][column]
+        if previous:
+            self._toggle(previous, dimension, position)
+        super()._clear_square(dimension, position)
+
+    def is_transfer_blocked(self, position, dimension):
+        # The destination must be empty on the other board.
+
+        return bool(self.occupied[2 - dimension] >> (position[0] * 8 + position[1]) & 1)
+
+    def move_mask(self, piece):
+        # Mask of the squares the piece can move to: pseudo-legal on its own board and empty on the other board.
+
+        row, column = piece.position
+        square = row * 8 + column
+        board_index = piece.dimension - 1
+        color = piece.color
+        occupied = self.occupied[board_index]
+        piece_type = piece.piece_type
+
+        if piece_type == PAWN:
+            targets = PAWN_ATTACKS[color][square] & self.color_masks[board_index][1 - color]
+            push = PAWN_STEPS[color][square] & ~occupied
+            if push:
+                targets |= push | PAWN_DOUBLE_STEPS[color][square] & ~occupied
+        elif piece_type == KNIGHT:
+            targets = KNIGHT_ATTACKS[square]
+        elif piece_type == KING:
+            targets = KING_ATTACKS[square]
+        elif piece_type == ROOK:
+            targets = rook_attacks(square, occupied)
+        elif piece_type == BISHOP:
+            targets = bishop_attacks(square, occupied)
+        else:
+            targets = rook_attacks(square, occupied) | bishop_attacks(square, occupied)
+
+        return targets & ~(self.color_masks[board_index][color] | self.occupied[1 - board_index])
+
+    def generate_moves(self, piece):
+        # Same contract as Piece.legal_moves, computed from the masks.
+
+        return squares_of(self.move_mask(piece))
+
+    def generate_captures(self, piece):
+        # Only the moves that capture an enemy piece on the piece's board.
+
+        return squares_of(self.move_mask(piece) & self.color_masks[piece.dimension - 1][1 - piece.color])
+
+    def generate_quiets(self, piece):
+        # Only the moves that do not capture.
+
+        return squares_of(self.move_mask(piece) & ~self.color_masks[piece.dimension - 1][1 - piece.color])
+
+    def is_attacked(self, square, dimension, color):
+        # Tells whether the pieces of `color` on the given board attack the square, looking from the square outwards
+        # with the same tables. Alice rule: capturing there sends the attacker to the other board, so the square
+        # only counts as attacked if it is empty on the other board.
+
+        board_index = dimension - 1
+        if self.occupied[1 - board_index] >> square & 1:
+            return False
+        masks = self.piece_masks[board_index][color]
+        occupied = self.occupied[board_index]
+        return bool(KNIGHT_ATTACKS[square] & masks[1]
+                    or KING_ATTACKS[square] & masks[5]
+                    or PAWN_ATTACKS[1 - color][square] & masks[0]
+                    or bishop_attacks(square, occupied) & (masks[2] | masks[4])
+                    or rook_attacks(square, occupied) & (masks[3] | masks[4]))
+
+    def in_check(self, color):
+        # Tells whether the king of `color` can be captured on its board.
+
+        for board_index in (0, 1):
+            king = self.piece_masks[board_index][color][KING]
+            if king:
+                return self.is_attacked(king.bit_length() - 1, board_index + 1, 1 - color)
+        return False
@@ -13,11 +13,64 @@ Course:         Artificial Intelligence
 Date:           2024 December
 '''
 
+from copy import copy as clone_piece
+from attacks import MOBILITY
+from zobrist import CASTLING_KEYS, PIECE_KEYS, SIDE_KEY
+
+# Colors and piece types are small integers, which also index the per-color and per-type tables
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+# Names of the codes, for display and text input
+COLOR_NAMES = ("White", "Black")
+TYPE_NAMES = ("Pawn", "Knight", "Bishop", "Rook", "Queen", "King")
+TYPE_LETTERS = "PNBRQK"
+
+# Castling rights bits
+WHITE_SHORT, WHITE_LONG, BLACK_SHORT, BLACK_LONG = 1, 2, 4, 8
+ALL_CASTLING = WHITE_SHORT | WHITE_LONG | BLACK_SHORT | BLACK_LONG
+# Rights kept when a move starts or ends on each square (a king or rook leaving home, or a rook being captured)
+CASTLING_MASK = [ALL_CASTLING] * 64
+CASTLING_MASK[0] ^= WHITE_LONG
+CASTLING_MASK[4] ^= WHITE_SHORT | WHITE_LONG
+CASTLING_MASK[7] ^= WHITE_SHORT
+CASTLING_MASK[56] ^= BLACK_LONG
+CASTLING_MASK[60] ^= BLACK_SHORT | BLACK_LONG
+CASTLING_MASK[63] ^= BLACK_SHORT
+
+# Cost table for positional evaluation: the higher the cost, the worse the square
+cost_table = [
+    [50, 30, 30, 30, 30, 30, 30, 50],
+    [30, 20, 20, 20, 20, 20, 20, 30],
+    [30, 20, 10, 10, 10, 10, 20, 30],
+    [30, 20, 10,  0,  0, 10, 20, 30],
+    [30, 20, 10,  0,  0, 10, 20, 30],
+    [30, 20, 10, 10, 10, 10, 20, 30],
+    [30, 20, 20, 20, 20, 20, 20, 30],
+    [50, 30, 30, 30, 30, 30, 30, 50]
+]
+PIECE_SCALE = 100  # Evaluation units per point of piece value
+# Positional score of a piece type on each square, the same on both boards: mobility minus the square's cost.
+# POSITIONAL_SCORES[color][piece type][square]
+POSITIONAL_SCORES = [[[MOBILITY[color][piece_type][square] - cost_table[square >> 3][square & 7]
+                        for square in range(64)] for piece_type in range(6)] for color in range(2)]
+
 class Board:
     def __init__(self):
         # Initializes the matrices representing the boards for white and black pieces
         self.white_board = [[None] * 8 for _ in range(8)]
         self.black_board = [[None] * 8 for _ in range(8)]
+        # Pieces on each board per color, piece_lists[dimension - 1][color], kept next to the matrices (which are the
+        # square -> piece map). Dicts are used as insertion-ordered sets, so adding and removing a piece is O(1).
+        self.piece_lists = [[{}, {}], [{}, {}]]
+        # One record per move applied with make_move, popped by unmake_move
+        self.undo_stack = []
+        self.side_to_move = WHITE
+        self.castling_rights = ALL_CASTLING
+        # Zobrist hash of the position, updated incrementally on every change
+        self.hash = CASTLING_KEYS[ALL_CASTLING]
+        # Evaluation terms per color over both boards, also updated incrementally
+        self.material = [0, 0]
+        self.positional = [0, 0]
 
     def display_boards(self):
         # Prints the boards in the console with a clear visual representation, including row and column labels.
@@ -44,20 +97,17 @@ class Board:
     def _display_cell(cell):
         # Visually represents a cell on the board. If there's a piece, it shows its symbol with color; otherwise, it displays a dot.
         if cell:
-            if cell.color == "White":
-                return f"\033[97m{cell.piece_type[0]}\033[0m"  # White color for white pieces
-            elif cell.color == "Black":
-                return f"\033[91m{cell.piece_type[0]}\033[0m"  # Red color for black pieces
+            if cell.color == WHITE:
+                return f"\033[97m{TYPE_LETTERS[cell.piece_type]}\033[0m"  # White color for white pieces
+            else:
+                return f"\033[91m{TYPE_LETTERS[cell.piece_type]}\033[0m"  # Red color for black pieces
         return "."  # Empty cell
 
     def add_piece(self, piece, position):
         # Places a piece at the specified position on the corresponding board.
 
-        row, column = position
-        if piece.dimension == 1:
-            self.white_board[row][column] = piece
-        elif piece.dimension == 2:
-            self.black_board[row][column] = piece
+        if piece.dimension in (1, 2):
+            self._set_square(piece, piece.dimension, position)
 
     def move_piece(self, piece, new_position):
         # Moves a piece from its current location to a new position, ensuring its state is updated and removing any piece at the destination.
@@ -74,44 +124,190 @@ class Board:
         if piece.dimension == 1:
             if not self.black_board[row][column] or self.black_board[row][column].color != piece.color:
                 piece.dimension = 2
-                self.black_board[row][column] = piece
+                self._set_square(piece, 2, new_position)
         elif piece.dimension == 2:
             if not self.white_board[row][column] or self.white_board[row][column].color != piece.color:
                 piece.dimension = 1
-                self.white_board[row][column] = piece
+                self._set_square(piece, 1, new_position)
 
         piece.position = new_position
 
     def create_copy(self):
-        #Generates a copy of the current state of both boards.
+        # Generates an independent copy of the current state of both boards. Pieces are cloned too, because
+        # make_move updates their position and dimension in place.
 
-        copy = Board()
-        copy.white_board = [row[:] for row in self.white_board]
-        copy.black_board = [row[:] for row in self.black_board]
+        copy = type(self)()
+        for dimension, board in ((1, self.white_board), (2, self.black_board)):
+            for row in board:
+                for piece in row:
+                    if piece:
+                        copy._set_square(clone_piece(piece), dimension, piece.position)
+        copy.set_castling_rights(self.castling_rights)
+        copy.set_side_to_move(self.side_to_move)
         return copy
 
+    def make_move(self, piece, position):
+        # Applies a move in place: the enemy piece on the destination of the piece's board is captured, the piece
+        # jumps to the other board and, when the king castles, the rook goes with it. The move is expected to be
+        # legal. Returns the captured piece, if any.
+
+        from_position, from_dimension = piece.position, piece.dimension
+        row, column = position
+        board = self.black_board if from_dimension == 2 else self.white_board
+        castling_rights = self.castling_rights
+
+        captured = board[row][column]
+        if captured:
+            self._clear_square(from_dimension, position)
+
+        castling_rook = None
+        if piece.piece_type == KING and abs(column - from_position[1]) == 2:
+            rook_column = 7 if column == 6 else 0
+            castling_rook = board[row][rook_column]
+            self._relocate(castling_rook, (row, 5 if column == 6 else 3), 3 - from_dimension)
+
+        self._relocate(piece, position, 3 - from_dimension)
+        self.set_castling_rights(castling_rights & CASTLING_MASK[from_position[0] * 8 + from_position[1]]
+                                 & CASTLING_MASK[row * 8 + column])
+        self._switch_side()
+        self.undo_stack.append((piece, from_position, from_dimension, captured, castling_rook, castling_rights))
+        return captured
+
+    def unmake_move(self):
+        # Takes back the last move applied with make_move, restoring the captured piece and the castling rook.
+
+        piece, from_position, from_dimension, captured, castling_rook, castling_rights = self.undo_stack.pop()
+        position = piece.position
+        self._relocate(piece, from_position, from_dimension)
+        if castling_rook:
+            self._relocate(castling_rook, (position[0], 7 if position[1] == 6 else 0), from_dimension)
+        if captured:
+            self._set_square(captured, from_dimension, position)
+        self.set_castling_rights(castling_rights)
+        self._switch_side()
+        return piece, position
+
+    def set_castling_rights(self, castling_rights):
+        # Replaces the castling rights, keeping the hash in sync.
+
+        self.hash ^= CASTLING_KEYS[self.castling_rights] ^ CASTLING_KEYS[castling_rights]
+        self.castling_rights = castling_rights
+
+    def set_side_to_move(self, color):
+        if color != self.side_to_move:
+            self._switch_side()
+
+    def _switch_side(self):
+        self.side_to_move ^= 1
+        self.hash ^= SIDE_KEY
+
+    def encode_move(self, piece, position):
+        # Packs a move into a small integer: origin square and dimension in the high bits, destination in the low
+        # six bits. Zero never encodes a real move.
+
+        return (((piece.dimension - 1) * 64 + piece.position[0] * 8 + piece.position[1]) << 6
+                | position[0] * 8 + position[1])
+
+    def decode_move(self, code):
+        # Inverse of encode_move for the current position. Returns (piece, position), or None if there is no piece.
+
+        origin, destination = code >> 6, code & 63
+        board = self.black_board if origin >= 64 else self.white_board
+        piece = board[(origin & 63) >> 3][origin & 7]
+        return (piece, divmod(destination, 8)) if piece else None
+
+    def _relocate(self, piece, position, dimension):
+        # Moves a piece to a square of the given board, keeping its position and dimension up to date.
+
+        self._clear_square(piece.dimension, piece.position)
+        piece.position = position
+        piece.dimension = dimension
+        self._set_square(piece, dimension, position)
+
     def _remove_piece(self, piece, position):
-        # Removes a piece from its current board (in both dimensions, if necessary).
+        # Removes a piece from the board it stands on.
 
-        for board in [self.white_board, self.black_board]:
-            for row in board:
-                if piece in row:
-                    row[row.index(piece)] = None
+        board = self.black_board if piece.dimension == 2 else self.white_board
+        if board[position[0]][position[1]] is piece:
+            self._clear_square(piece.dimension, position)
 
     def remove_piece_at(self, position):
         # Removes a piece from a specific position, if it exists.
 
         row, column = position
         if self.white_board[row][column]:
-            self.white_board[row][column] = None
+            self._clear_square(1, position)
         elif self.black_board[row][column]:
-            self.black_board[row][column] = None
+            self._clear_square(2, position)
+
+    def _set_square(self, piece, dimension, position):
+        # Stores a piece on a square of the given board. Every placement goes through here so the hash, the
+        # evaluation terms and whatever extra state a subclass keeps (occupancy masks...) stay in sync with the
+        # matrices.
+
+        row, column = position
+        board = self.black_board if dimension == 2 else self.white_board
+        previous = board[row][column]
+        if previous:
+            self._account(previous, dimension, row * 8 + column, -1)
+            del self.piece_lists[dimension - 1][previous.color][previous]
+        board[row][column] = piece
+        self.piece_lists[dimension - 1][piece.color][piece] = None
+        self._account(piece, dimension, row * 8 + column, 1)
+
+    def _clear_square(self, dimension, position):
+        # Empties a square of the given board. Counterpart of _set_square.
+
+        row, column = position
+        board = self.black_board if dimension == 2 else self.white_board
+        previous = board[row][column]
+        if previous:
+            self._account(previous, dimension, row * 8 + column, -1)
+            del self.piece_lists[dimension - 1][previous.color][previous]
+        board[row][column] = None
+
+    def _account(self, piece, dimension, square, sign):
+        # Adds (sign 1) or removes (sign -1) a piece from the hash and the evaluation terms.
+
+        color = piece.color
+        piece_type = piece.piece_type
+        self.hash ^= PIECE_KEYS[dimension - 1][color][piece_type][square]
+        self.material[color] += sign * piece.value
+        self.positional[color] += sign * POSITIONAL_SCORES[color][piece_type][square]
+
+    def evaluate(self):
+        # Static evaluation from the incremental terms: material, square costs and mobility. Positive favors White.
+
+        return ((self.material[0] - self.material[1]) * PIECE_SCALE
+                + self.positional[0] - self.positional[1])
+
+    def is_transfer_blocked(self, position, dimension):
+        # Alice rule: a piece moving on one board lands on the other one, so the destination must be empty there.
+
+        row, column = position
+        board = self.white_board if dimension == 2 else self.black_board
+        return board[row][column] is not None
 
     def get_opponent_pieces(self, color, dimension):
         # Returns a list of all opponent pieces on the specified board.
 
-        board = self.black_board if dimension == 2 else self.white_board
-        return [cell for row in board for cell in row if cell and cell.color != color]
+        return list(self.piece_lists[dimension - 1][1 - color])
+
+    def get_pieces(self, color):
+        # Returns every piece of a color, on both boards.
+
+        return [*self.piece_lists[0][color], *self.piece_lists[1][color]]
+
+    def find_piece(self, position, color=None):
+        # Returns the piece on a square, looking at the left board first, or None. With a color, only a piece of
+        # that color is returned.
+
+        row, column = position
+        for board in (self.white_board, self.black_board):
+            piece = board[row][column]
+            if piece is not None and (color is None or piece.color == color):
+                return piece
+        return None
 
     def _valid_position(self, position):
         #Checks if a position is within the board boundaries.
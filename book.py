@@ -0,0 +1,173 @@
+'''
+book.py
+Opening book. The book is a binary file of fixed size records (position hash, move, weight), sorted by hash, that is
+read through mmap: a lookup is a binary search over the file, so nothing is loaded up front and the operating system
+shares the pages between processes. The hash is the board's Zobrist hash and the move is board.encode_move, so a
+record is only valid for the position it was built from; moves are checked against the legal moves anyway.
+
+The builder replays game records (the lines written by selfplay.py, "<result> <termination> <moves...>") and gives
+every move of the first plies a weight from the results of the games it was played in: 2 for a win of the side that
+played it, 1 for a draw, 0 for a loss. Moves that only lost are left out.
+
+    python book.py build games.txt book.bin --plies 12
+    python book.py build --selfplay 500 --depth 2 book.bin
+    python book.py probe book.bin 1e2e4 1e7e5
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import tempfile
+
+import movegen
+import notation
+import pieces
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_PLIES = 12  # Plies of every game that go into the book
+RECORD = struct.Struct("<QHH")  # Position hash, encoded move, weight
+MAX_WEIGHT = 0xFFFF
+RESULT_POINTS = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1)}  # (White points, Black points)
+
+class OpeningBook:
+    def __init__(self, path=BOOK_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.size = size // RECORD.size
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _key(self, index):
+        return RECORD.unpack_from(self._map, index * RECORD.size)[0]
+
+    def entries(self, key):
+        # Every (move code, weight) stored for a position hash.
+
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        while low < self.size:
+            entry_key, move, weight = RECORD.unpack_from(self._map, low * RECORD.size)
+            if entry_key != key:
+                break
+            entries.append((move, weight))
+            low += 1
+        return entries
+
+    def probe(self, board, generator=random):
+        # Picks one of the book moves of the position, with probability proportional to its weight. Returns
+        # (piece, position), or None if the position is not in the book.
+
+        legal = movegen.generate_legal_moves(board, board.side_to_move)
+        candidates = []
+        for code, weight in self.entries(board.hash):
+            move = board.decode_move(code)
+            if move in legal and weight > 0:
+                candidates.append((move, weight))
+        if not candidates:
+            return None
+        choice = generator.uniform(0, sum(weight for _, weight in candidates))
+        for move, weight in candidates:
+            choice -= weight
+            if choice <= 0:
+                return move
+        return candidates[-1][0]
+
+_book = None
+
+def probe(board):
+    # Book move for the position from the default book file, or None if there is no book or no entry. The file is
+    # opened on the first call and stays mapped.
+
+    global _book
+    if _book is None:
+        if not os.path.exists(BOOK_PATH):
+            return None
+        _book = OpeningBook(BOOK_PATH)
+    return _book.probe(board)
+
+def build(records, path, plies=BOOK_PLIES):
+    # Writes a book from game records (lines of selfplay.py). Returns the number of records written.
+
+    weights = {}
+    for line in records:
+        fields = line.split()
+        if len(fields) < 2 or fields[0] not in RESULT_POINTS:
+            continue
+        points = RESULT_POINTS[fields[0]]
+        pieces.initialize_pieces()
+        board = pieces.board
+        for text in fields[2:2 + plies]:
+            try:
+                piece, position = notation.parse_move(board, text)
+            except ValueError:
+                break
+            key = (board.hash, board.encode_move(piece, position))
+            weights[key] = weights.get(key, 0) + points[board.side_to_move]
+            board.make_move(piece, position)
+
+    entries = sorted((key, move, min(weight, MAX_WEIGHT)) for (key, move), weight in weights.items() if weight > 0)
+    with open(path, "wb") as book_file:
+        for entry in entries:
+            book_file.write(RECORD.pack(*entry))
+    return len(entries)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the opening book.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="build a book from game records or from new self-play games")
+    build_parser.add_argument("sources", nargs="*", help="game record files, then the book file")
+    build_parser.add_argument("--plies", type=int, default=BOOK_PLIES, help="plies of every game to keep")
+    build_parser.add_argument("--selfplay", type=int, default=0, help="self-play games to play for the book")
+    build_parser.add_argument("--depth", type=int, default=2, help="search depth of the self-play games")
+    probe_parser = commands.add_parser("probe", help="list the book moves of a position")
+    probe_parser.add_argument("book", help="book file")
+    probe_parser.add_argument("moves", nargs="*", help="moves from the initial position")
+    arguments = parser.parse_args()
+
+    if arguments.command == "build":
+        if not arguments.sources:
+            parser.error("the book file is missing")
+        *sources, book_path = arguments.sources
+        lines = []
+        for source in sources:
+            with open(source) as source_file:
+                lines.extend(source_file)
+        if arguments.selfplay:
+            import selfplay
+            with tempfile.TemporaryDirectory() as directory:
+                games_path = os.path.join(directory, "games.txt")
+                selfplay.run_match(arguments.selfplay, max_depth=arguments.depth, output=games_path)
+                with open(games_path) as games_file:
+                    lines.extend(games_file)
+        print(f"{build(lines, book_path, arguments.plies)} records written to {book_path}")
+    else:
+        pieces.initialize_pieces()
+        notation.play_moves(pieces.board, arguments.moves)
+        opening_book = OpeningBook(arguments.book)
+        for code, weight in sorted(opening_book.entries(pieces.board.hash), key=lambda entry: -entry[1]):
+            move = pieces.board.decode_move(code)
+            print(f"{notation.move_text(*move) if move else code}: {weight}")
+        opening_book.close()
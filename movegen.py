@@ -0,0 +1,265 @@
+'''
+movegen.py
+Legal move generator for Alice chess over the BitBoard. For each position it computes, once, the squares the enemy
+attacks on the board the king would land on, whether the king is in check and which pieces are pinned. With that:
+    - king moves only need a mask test against the enemy attacks on the other board (the king always changes board);
+    - pieces that are neither pinned nor shielding the king move freely: taking a piece off the king's board can only
+      expose the king through a pin (or by capturing an enemy piece that blocks a line), and a piece arriving there
+      can only block;
+    - in check, only the moves that capture a checking piece or block its line are tried;
+    - those moves, the moves of pinned or shielding pieces, captures of blocking pieces and castling are verified by
+      playing the move and looking at the king.
+A king is in check when an enemy piece on its board attacks it and the king's square on the other board is empty
+(the capture has to be a legal Alice move). A piece on that square shields the king.
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+from attacks import (KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, POSITIVE_DIRECTIONS, RAY_MASKS, ROOK_DIRECTIONS,
+                     bishop_attacks, rook_attacks)
+from bitboard import squares_of
+from board import KING, PIECE_SCALE
+
+def opponent(color):
+    return 1 - color
+
+def nearest(blockers, direction):
+    # Square of the blocker closest to the origin of a ray.
+
+    if POSITIVE_DIRECTIONS[direction]:
+        return (blockers & -blockers).bit_length() - 1
+    return blockers.bit_length() - 1
+
+def find_king(board, color):
+    # Returns (square, dimension) of the king of `color`, or None if it is not on the boards.
+
+    for board_index in (0, 1):
+        king = board.piece_masks[board_index][color][KING]
+        if king:
+            return king.bit_length() - 1, board_index + 1
+    return None
+
+def attack_map(board, color, dimension):
+    # Mask of the squares the pieces of `color` attack on one board. These are plain attacks: whether the capture
+    # is also possible on the other board is left to the caller.
+
+    board_index = dimension - 1
+    masks = board.piece_masks[board_index][color]
+    occupied = board.occupied[board_index]
+    attacks = 0
+    for piece_type, table in ((0, PAWN_ATTACKS[color]), (1, KNIGHT_ATTACKS), (5, KING_ATTACKS)):
+        pieces_mask = masks[piece_type]
+        while pieces_mask:
+            low = pieces_mask & -pieces_mask
+            attacks |= table[low.bit_length() - 1]
+            pieces_mask ^= low
+    for pieces_mask, slider_attacks in ((masks[2] | masks[4], bishop_attacks), (masks[3] | masks[4], rook_attacks)):
+        while pieces_mask:
+            low = pieces_mask & -pieces_mask
+            attacks |= slider_attacks(low.bit_length() - 1, occupied)
+            pieces_mask ^= low
+    return attacks
+
+def checkers(board, color):
+    # Enemy pieces giving check to the king of `color`.
+
+    king = find_king(board, color)
+    if king is None:
+        return []
+    square, dimension = king
+    if board.occupied[2 - dimension] >> square & 1:
+        return []
+    target = divmod(square, 8)
+    return [piece for piece in board.get_opponent_pieces(color, dimension) if target in board.generate_captures(piece)]
+
+def evasion_squares(board, color, square, dimension):
+    # Mask of the squares a piece other than the king has to move to when the king of `color` is in check: the
+    # squares of the checking pieces and those between a checking slider and the king. A piece on the king's board
+    # lands on the other board, so from there it can only capture; a piece on the other board lands on the king's
+    # board, so it can only block.
+
+    enemy = board.piece_masks[dimension - 1][1 - color]
+    occupied = board.occupied[dimension - 1]
+    checking = (KNIGHT_ATTACKS[square] & enemy[1] | KING_ATTACKS[square] & enemy[5]
+                | PAWN_ATTACKS[color][square] & enemy[0])
+    evasions = checking
+    for direction in range(8):
+        sliders = enemy[3] | enemy[4] if direction in ROOK_DIRECTIONS else enemy[2] | enemy[4]
+        blockers = RAY_MASKS[square][direction] & occupied
+        if blockers:
+            first = nearest(blockers, direction)
+            if sliders >> first & 1:
+                evasions |= RAY_MASKS[square][direction] & ~RAY_MASKS[first][direction]
+    return evasions
+
+def unsafe_pieces(board, color, square, dimension):
+    # Returns (pieces, squares) of the moves of `color` that can expose its king: the pieces pinned on the king's
+    # board, or the piece shielding the king from the other board (while a shield stands, nothing on the king's board
+    # is pinned), and the mask of the enemy pieces whose capture would open a line to the king. Captures send the
+    # capturer to the other board, so taking a blocking piece can leave the line empty.
+
+    board_index = dimension - 1
+    other_grid = board.white_board if dimension == 2 else board.black_board
+    shield = other_grid[square >> 3][square & 7]
+    if shield:
+        return ({shield} if shield.color == color else set()), 0
+
+    grid = board.black_board if dimension == 2 else board.white_board
+    own = board.color_masks[board_index][color]
+    enemy = board.piece_masks[board_index][1 - color]
+    occupied = board.occupied[board_index]
+    pinned = set()
+    guarded = 0
+    for direction in range(8):
+        sliders = enemy[3] | enemy[4] if direction in ROOK_DIRECTIONS else enemy[2] | enemy[4]
+        blockers = RAY_MASKS[square][direction] & occupied
+        # A move takes at most two pieces off a ray (the mover and the captured piece), so the first two blockers
+        # are the ones that matter
+        line = []
+        while blockers and len(line) < 3:
+            blocker = nearest(blockers, direction)
+            if sliders >> blocker & 1:
+                for between in line:
+                    if own >> between & 1:
+                        pinned.add(grid[between >> 3][between & 7])
+                    else:
+                        guarded |= 1 << between
+                break
+            line.append(blocker)
+            blockers &= RAY_MASKS[blocker][direction]
+    return pinned, guarded
+
+def leaves_king_safe(board, piece, position):
+    # Plays the move and tells whether the mover's king is out of check afterwards.
+
+    color = piece.color
+    board.make_move(piece, position)
+    safe = not board.in_check(color)
+    board.unmake_move()
+    return safe
+
+def generate_legal_moves(board, color, captures_only=False, quiets_only=False):
+    # Every fully legal move of `color` as (piece, position) pairs, castling included. With captures_only, only the
+    # captures (castling never captures); with quiets_only, only the moves that do not capture.
+
+    if captures_only:
+        generate = board.generate_captures
+    elif quiets_only:
+        generate = board.generate_quiets
+    else:
+        generate = board.generate_moves
+    own_pieces = board.get_pieces(color)
+    king_location = find_king(board, color)
+    if king_location is None:
+        return [(piece, move) for piece in own_pieces for move in generate(piece)]
+
+    enemy = opponent(color)
+    king_square, king_dimension = king_location
+    in_check = board.is_attacked(king_square, king_dimension, enemy)
+    # The king always lands on the other board, where the position does not change while it moves
+    king_danger = attack_map(board, enemy, 3 - king_dimension)
+    if in_check:
+        evasions = evasion_squares(board, color, king_square, king_dimension)
+    else:
+        unsafe, guarded = unsafe_pieces(board, color, king_square, king_dimension)
+
+    moves = []
+    for piece in own_pieces:
+        if piece.piece_type == KING:
+            mask = board.move_mask(piece) & ~king_danger
+            if captures_only:
+                mask &= board.color_masks[king_dimension - 1][1 - color]
+            elif quiets_only:
+                mask &= ~board.color_masks[king_dimension - 1][1 - color]
+            moves.extend((piece, move) for move in squares_of(mask))
+            if not captures_only and not in_check:
+                moves.extend((piece, move) for move in castling_moves(board, piece, enemy))
+        elif in_check:
+            moves.extend((piece, move) for move in generate(piece)
+                         if evasions >> (move[0] * 8 + move[1]) & 1 and leaves_king_safe(board, piece, move))
+        elif piece in unsafe:
+            moves.extend((piece, move) for move in generate(piece) if leaves_king_safe(board, piece, move))
+        else:
+            for move in generate(piece):
+                if not guarded >> (move[0] * 8 + move[1]) & 1 or leaves_king_safe(board, piece, move):
+                    moves.append((piece, move))
+    return moves
+
+def castling_moves(board, king, enemy):
+    # Castling moves of a king that is not in check: it may not cross an attacked square on its board nor end in
+    # check on the other one.
+
+    moves = []
+    candidates = [move for move in king.castle(board.white_board, board.black_board, board.castling_rights)
+                  if not board.is_transfer_blocked(move, king.dimension)]
+    if candidates:
+        crossed_danger = attack_map(board, enemy, king.dimension)
+        for move in candidates:
+            crossed = move[0] * 8 + (5 if move[1] == 6 else 3)
+            if not crossed_danger >> crossed & 1 and leaves_king_safe(board, king, move):
+                moves.append(move)
+    return moves
+
+def has_legal_moves(board, color):
+    return bool(generate_legal_moves(board, color))
+
+def is_legal(board, color, piece, position):
+    # Full legality test of a single move that did not come from the generator, such as a move remembered from
+    # another position (hash and killer moves).
+
+    if piece.color != color:
+        return False
+    if piece.piece_type == KING and abs(position[1] - piece.position[1]) == 2:
+        return not board.in_check(color) and position in castling_moves(board, piece, opponent(color))
+    if not board.move_mask(piece) >> (position[0] * 8 + position[1]) & 1:
+        return False
+    return leaves_king_safe(board, piece, position)
+
+def staged_moves(board, color, hash_move=0, killers=(), history=None):
+    # Yields the legal moves of `color` in search order, one stage at a time: the hash move, the captures by most
+    # valuable victim / least valuable attacker, the killer moves, then the quiet moves by history score. A stage is
+    # only generated when the search asks for a move past the previous one, so after a cutoff the remaining stages
+    # cost nothing. The board may be changed between two moves as long as it is restored before the next one.
+
+    tried = set()
+    if hash_move:
+        move = board.decode_move(hash_move)
+        if move is not None and is_legal(board, color, *move):
+            tried.add(hash_move)
+            yield move
+
+    captures = generate_legal_moves(board, color, captures_only=True)
+    if captures:
+        scored = []
+        for piece, position in captures:
+            victim = (board.black_board if piece.dimension == 2 else board.white_board)[position[0]][position[1]]
+            scored.append((victim.value * PIECE_SCALE - piece.value, piece, position))
+        scored.sort(key=lambda entry: entry[0], reverse=True)
+        for _, piece, position in scored:
+            if board.encode_move(piece, position) not in tried:
+                yield piece, position
+
+    for code in killers:
+        if code and code not in tried:
+            move = board.decode_move(code)
+            if move is None:
+                continue
+            piece, position = move
+            grid = board.black_board if piece.dimension == 2 else board.white_board
+            if grid[position[0]][position[1]] is None and is_legal(board, color, piece, position):
+                tried.add(code)
+                yield move
+
+    quiets = generate_legal_moves(board, color, quiets_only=True)
+    if history is not None:
+        quiets.sort(key=lambda move: history[board.encode_move(*move)], reverse=True)
+    for piece, position in quiets:
+        if board.encode_move(piece, position) not in tried:
+            yield piece, position
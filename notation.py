@@ -0,0 +1,190 @@
+'''
+notation.py
+Text form of the moves, shared by the tools that read or print them. A move is written as the board the piece
+stands on (1 left, 2 right) followed by the origin and destination squares in coordinate notation: "1e2e4" moves
+the piece on e2 of the left board to e4 (where it lands on the right board). The board is needed because two pieces
+of the same side can stand on the same square of different boards. Row 0 of the matrices is rank 1 and column 0 is
+file a.
+
+Positions are written like FEN, with one piece placement field per board:
+    <left board> <right board> <side to move> <castling rights>
+    rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR 8/8/8/8/8/8/8/8 w KQkq
+Each board lists its ranks from 8 down to 1, White's pieces in capitals (PNBRQK) and Black's in lower case, digits
+for runs of empty squares. The side is "w" or "b" and the castling rights "KQkq", a subset of it or "-".
+
+For bulk storage, a position also packs into POSITION_BYTES bytes: one byte per square (0 empty, otherwise
+1 + (board - 1) * 12 + color * 6 + piece type) followed by one byte with the side to move in bit 0 and the castling
+rights above it. A piece only ever lands on a square that is empty on the other board, so in a game played from the
+initial position a square is never occupied on both boards and one byte per square is enough. Records can be read
+and used (see batch_eval.encode_packed) without creating any piece.
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import movegen
+import pieces
+from bitboard import BitBoard
+from board import BLACK, BLACK_LONG, BLACK_SHORT, TYPE_LETTERS, WHITE, WHITE_LONG, WHITE_SHORT
+
+FILES = "abcdefgh"
+START_POSITION = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR 8/8/8/8/8/8/8/8 w KQkq"
+CASTLING_LETTERS = ((WHITE_SHORT, "K"), (WHITE_LONG, "Q"), (BLACK_SHORT, "k"), (BLACK_LONG, "q"))
+POSITION_BYTES = 65
+
+def square_name(position):
+    row, column = position
+    return f"{FILES[column]}{row + 1}"
+
+def parse_square(text):
+    # Converts a square name such as "e4" into a (row, column) position. Raises ValueError if it is not one.
+
+    if len(text) != 2 or text[0] not in FILES or text[1] not in "12345678":
+        raise ValueError(f"Invalid square: {text!r}")
+    return int(text[1]) - 1, FILES.index(text[0])
+
+def move_text(piece, position):
+    return f"{piece.dimension}{square_name(piece.position)}{square_name(position)}"
+
+def parse_move(board, text):
+    # Finds the legal move of the side to move written as `text`. Returns (piece, position); raises ValueError if
+    # the text is malformed or the move is not legal in the position.
+
+    if len(text) != 5 or text[0] not in "12":
+        raise ValueError(f"Invalid move: {text!r}")
+    dimension = int(text[0])
+    origin, destination = parse_square(text[1:3]), parse_square(text[3:5])
+    for piece, position in movegen.generate_legal_moves(board, board.side_to_move):
+        if piece.dimension == dimension and piece.position == origin and position == destination:
+            return piece, position
+    raise ValueError(f"Illegal move: {text}")
+
+def play_moves(board, texts):
+    # Plays a sequence of moves in text form on the board.
+
+    for text in texts:
+        board.make_move(*parse_move(board, text))
+
+def line_text(board, moves):
+    # Writes a sequence of moves that starts in the current position, such as a principal variation. The moves are
+    # played on the board while they are written, since a piece that moves twice has a different origin each time.
+
+    texts = []
+    for piece, position in moves:
+        texts.append(move_text(piece, position))
+        board.make_move(piece, position)
+    for _ in moves:
+        board.unmake_move()
+    return " ".join(texts)
+
+def position_text(board):
+    # Writes the position in the notation above.
+
+    fields = []
+    for grid in (board.white_board, board.black_board):
+        ranks = []
+        for row in range(7, -1, -1):
+            text = ""
+            empty = 0
+            for piece in grid[row]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = TYPE_LETTERS[piece.piece_type]
+                text += letter if piece.color == WHITE else letter.lower()
+            if empty:
+                text += str(empty)
+            ranks.append(text)
+        fields.append("/".join(ranks))
+    fields.append("w" if board.side_to_move == WHITE else "b")
+    fields.append("".join(letter for right, letter in CASTLING_LETTERS if board.castling_rights & right) or "-")
+    return " ".join(fields)
+
+def parse_position(text):
+    # Builds a new board from a position in the notation above. Raises ValueError if the text is not one.
+
+    fields = text.split()
+    if len(fields) != 4 or fields[2] not in ("w", "b"):
+        raise ValueError(f"Invalid position: {text!r}")
+    board = BitBoard()
+    for dimension, placement in ((1, fields[0]), (2, fields[1])):
+        ranks = placement.split("/")
+        if len(ranks) != 8:
+            raise ValueError(f"Invalid board in position: {placement!r}")
+        for index, rank in enumerate(ranks):
+            row = 7 - index
+            column = 0
+            for character in rank:
+                if character in "12345678":
+                    column += int(character)
+                    continue
+                piece_type = TYPE_LETTERS.find(character.upper())
+                if piece_type < 0 or column > 7:
+                    raise ValueError(f"Invalid rank in position: {rank!r}")
+                color = WHITE if character.isupper() else BLACK
+                board.add_piece(pieces.create_piece(piece_type, color, (row, column), dimension), (row, column))
+                column += 1
+            if column != 8:
+                raise ValueError(f"Invalid rank in position: {rank!r}")
+
+    castling_rights = 0
+    if fields[3] != "-":
+        letters = dict((letter, right) for right, letter in CASTLING_LETTERS)
+        for letter in fields[3]:
+            if letter not in letters:
+                raise ValueError(f"Invalid castling rights: {fields[3]!r}")
+            castling_rights |= letters[letter]
+    board.set_castling_rights(castling_rights)
+    board.set_side_to_move(WHITE if fields[2] == "w" else BLACK)
+    return board
+
+def pack_position(board):
+    # Packs the position into POSITION_BYTES bytes. Raises ValueError if a square is occupied on both boards.
+
+    data = bytearray(POSITION_BYTES)
+    for dimension in range(2):
+        for color in range(2):
+            code = 1 + dimension * 12 + color * 6
+            for piece in board.piece_lists[dimension][color]:
+                square = piece.position[0] * 8 + piece.position[1]
+                if data[square]:
+                    raise ValueError(f"Square {square_name(piece.position)} is occupied on both boards")
+                data[square] = code + piece.piece_type
+    data[64] = board.side_to_move | board.castling_rights << 1
+    return bytes(data)
+
+def unpack_position(data):
+    # Builds a new board from a packed position.
+
+    if len(data) != POSITION_BYTES:
+        raise ValueError(f"A packed position has {POSITION_BYTES} bytes, not {len(data)}")
+    board = BitBoard()
+    for square in range(64):
+        code = data[square]
+        if code:
+            code -= 1
+            position = divmod(square, 8)
+            dimension = code // 12 + 1
+            board.add_piece(pieces.create_piece(code % 6, code // 6 % 2, position, dimension), position)
+    board.set_castling_rights(data[64] >> 1)
+    board.set_side_to_move(data[64] & 1)
+    return board
+
+def read_packed(stream, chunk_positions=4096):
+    # Yields the packed positions of a binary file, as bytes, reading many at a time.
+
+    while True:
+        chunk = stream.read(chunk_positions * POSITION_BYTES)
+        for offset in range(0, len(chunk) - POSITION_BYTES + 1, POSITION_BYTES):
+            yield chunk[offset:offset + POSITION_BYTES]
+        if len(chunk) < chunk_positions * POSITION_BYTES:
+            return
@@ -0,0 +1,172 @@
+'''
+perft.py
+Counts the leaf nodes of the legal move tree of an Alice position to a fixed depth (perft), to check the move
+generator against known counts and to time it. Positions are given in the notation of notation.py, as a position
+(the initial one by default) and the moves played from it. The divide option prints the count under every root
+move, which points to the move where two generators disagree.
+
+    python perft.py --depth 3
+    python perft.py --depth 3 --moves 1e2e4 1e7e5 --divide
+    python perft.py --depth 3 --fen "4k3/8/8/8/8/8/8/R3K3 8/8/8/8/8/8/8/8 w Q"
+    python perft.py --reference
+    python perft.py --generators
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import argparse
+import time
+
+import movegen
+import notation
+import pieces
+
+# (name, position or None for the initial one, moves played from it, {depth: leaf nodes}). Every count was checked
+# against a generator that plays each pseudo-legal move and tests the king afterwards.
+REFERENCE_POSITIONS = [
+    ("initial", None, [], {1: 20, 2: 400, 3: 9388, 4: 219533}),
+    # Black to move in check from the queen on c6
+    ("check", None, "1d2d3 1c7c5 1d1d7 1d8d4 1c1d2 1e7e5 2d7c6".split(), {1: 6, 2: 237, 3: 8503, 4: 311273}),
+    # Both kings can still castle
+    ("castling", None, ("1d2d3 1c7c5 1d1d7 1d8d4 1c1d2 1e7e5 2d7c6 1b7c6 1e2e3 2d4d5 1b1c3 1c8e6 1a2a4 "
+                  "1d5g2").split(), {1: 36, 2: 1464, 3: 45995}),
+    # Capturing an enemy piece that blocks a line to the king exposes it
+    ("blocker", None, ("1d2d3 1c7c5 1d1d7 1d8d4 1c1d2 1e7e5 2d7c6 1b7c6 1e2e3 2d4d5 1b1c3 1c8e6 1a2a4 1d5g2 1a1a5 "
+                 "2g2g5 1c2c4 1g5f4 1g1e2 1h7h5 2c3b1 2f4e4 1e1d1 1h8h4 1f1h3 1e4e7 1h1e1 2e6f5 1b1c3 1b8d7 1b2b4 "
+                 "2e7f6 2a5c5 1f6a1 2d1c1 2a1d1 1c1d1 2d7b8 1c5f5 2h4c4 2e2g3 1e8d7 2e1e2").split(),
+     {1: 30, 2: 1062, 3: 26077}),
+    # Pinned pieces on the king's board
+    ("pin", None, ("1a2a3 1h7h6 1d2d4 1a7a6 1a1a8 1h8h5 1e2e3 1g7g5 1b2b3 1f8g7 2b3b4 2g7f6 1h2h4 1f6c3 1d1e2 1f7f5 "
+             "2e2h5 1e8f7 1c1f4 2f7g7 2a8e8 1g7g6 2f4g5 2g6g7 1h5g4 1g7f7 1g5e7 2f7g6 1e8e5 1g6f7 2g4f4 1g8f6 1h1h2 "
+             "1d8g5 2a3a4 1c7c6 1g2g3 2c6c5 1f1c4 2f7e8 1f4e4 2f5f4 2c4b5").split(), {1: 29, 2: 1299, 3: 36119}),
+    # White can castle long with the black queen and a white knight already on the right board
+    ("split", "4k3/8/8/3p4/8/8/8/R3K3 8/2q5/8/8/4N3/8/5P2/8 w Q", [], {1: 23, 2: 611, 3: 13237, 4: 308107}),
+    # Black castles either way while the white king and bishop stand on the right board
+    ("right king", "r3k2r/p7/8/8/8/8/6P1/8 8/8/2n5/8/3B4/8/8/4K3 b kq", [],
+     {1: 28, 2: 489, 3: 14620, 4: 237662}),
+]
+
+def perft(board, depth):
+    # Leaf nodes below the position, the last ply counted without playing the moves.
+
+    moves = movegen.generate_legal_moves(board, board.side_to_move)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for piece, position in moves:
+        board.make_move(piece, position)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+def divide(board, depth):
+    # Leaf nodes under each root move, as a list of (move text, nodes) sorted by move text.
+
+    counts = []
+    for piece, position in movegen.generate_legal_moves(board, board.side_to_move):
+        text = notation.move_text(piece, position)
+        board.make_move(piece, position)
+        counts.append((text, perft(board, depth - 1)))
+        board.unmake_move()
+    return sorted(counts)
+
+def setup(moves, position=None):
+    # New game from the position (the initial one if None) with the moves already played. Returns the board.
+
+    if position is None:
+        pieces.initialize_pieces()
+    else:
+        pieces.set_board(notation.parse_position(position))
+    notation.play_moves(pieces.board, moves)
+    return pieces.board
+
+def run(moves, depth, show_divide=False, position=None):
+    # Prints the count of one position with the time it took. Returns the node count.
+
+    board = setup(moves, position)
+    started = time.perf_counter()
+    if show_divide:
+        counts = divide(board, depth)
+        for text, count in counts:
+            print(f"{text}: {count}")
+        nodes = sum(count for _, count in counts)
+    else:
+        nodes = perft(board, depth)
+    elapsed = time.perf_counter() - started
+    print(f"Depth {depth}: {nodes} nodes in {elapsed:.2f}s ({nodes / max(elapsed, 1e-9):.0f} nodes/s)")
+    return nodes
+
+def run_reference(max_depth=None):
+    # Checks every reference position. Returns True if all the counts match.
+
+    passed = True
+    total_nodes, started = 0, time.perf_counter()
+    for name, position, moves, expected in REFERENCE_POSITIONS:
+        board = setup(moves, position)
+        for depth, count in sorted(expected.items()):
+            if max_depth is not None and depth > max_depth:
+                continue
+            nodes = perft(board, depth)
+            total_nodes += nodes
+            status = "ok" if nodes == count else f"FAILED (expected {count})"
+            passed = passed and nodes == count
+            print(f"{name} depth {depth}: {nodes} {status}")
+    elapsed = time.perf_counter() - started
+    print(f"{total_nodes} nodes in {elapsed:.2f}s ({total_nodes / max(elapsed, 1e-9):.0f} nodes/s)")
+    return passed
+
+def benchmark_generators(repeat=1000):
+    # Times the piece move generators alone over the reference positions: the table-driven generator of pieces.py,
+    # which walks the matrices, against the BitBoard masks the search uses. Both must produce the same moves for
+    # every piece, which is checked first. Prints the moves generated per second of each. Returns False if they
+    # disagree.
+
+    boards = [setup(moves, position) for _, position, moves, _ in REFERENCE_POSITIONS]
+    for board in boards:
+        for piece in board.get_pieces(board.side_to_move):
+            matrix_moves = sorted(pieces.generate_moves(piece, board.white_board, board.black_board))
+            mask_moves = sorted(board.generate_moves(piece))
+            if matrix_moves != mask_moves:
+                print(f"Generators disagree for {piece}: {matrix_moves} against {mask_moves}")
+                return False
+
+    generators = (("pieces.generate_moves", lambda board, piece: pieces.generate_moves(piece, board.white_board,
+                                                                                        board.black_board)),
+                  ("BitBoard.generate_moves", lambda board, piece: board.generate_moves(piece)))
+    for name, generate in generators:
+        moves = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for board in boards:
+                for piece in board.get_pieces(board.side_to_move):
+                    moves += len(generate(board, piece))
+        elapsed = time.perf_counter() - started
+        print(f"{name}: {moves} moves in {elapsed:.2f}s ({moves / max(elapsed, 1e-9):.0f} moves/s)")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perft for the Alice chess move generator.")
+    parser.add_argument("--depth", type=int, default=3, help="plies to count")
+    parser.add_argument("--fen", default=None, help="position to start from instead of the initial one")
+    parser.add_argument("--moves", nargs="*", default=[], help="moves from the position, e.g. 1e2e4")
+    parser.add_argument("--divide", action="store_true", help="print the count under every root move")
+    parser.add_argument("--reference", action="store_true", help="check the reference positions")
+    parser.add_argument("--max-depth", type=int, default=None, help="deepest reference count to check")
+    parser.add_argument("--generators", action="store_true", help="time the piece move generators alone")
+    arguments = parser.parse_args()
+
+    if arguments.reference:
+        raise SystemExit(0 if run_reference(arguments.max_depth) else 1)
+    if arguments.generators:
+        raise SystemExit(0 if benchmark_generators() else 1)
+    try:
+        run(arguments.moves, arguments.depth, arguments.divide, arguments.fen)
+    except ValueError as error:
+        parser.error(str(error))
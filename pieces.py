@@ -12,67 +12,63 @@ Course:         Artificial Intelligence
 Date:           2024 December
 '''
 
-import board
+from attacks import PAWN_CAPTURE_TARGETS, PIECE_RAYS
+import movegen
+from bitboard import BitBoard
+from board import (ALL_CASTLING, BISHOP, BLACK, BLACK_LONG, BLACK_SHORT, COLOR_NAMES, KING, KNIGHT, PAWN, QUEEN,
+                   ROOK, TYPE_NAMES, WHITE, WHITE_LONG, WHITE_SHORT)
 
 class Piece:
+    # Fixed attributes and no __dict__: the search creates no pieces, but reads these fields at every node.
+    __slots__ = ("piece_type", "color", "position", "dimension", "value")
+
     def __init__(self, piece_type, color, position, dimension, value):
-        self.piece_type = piece_type  # Piece type: "King", "Queen", "Rook", etc.
-        self.color = color  # Color: "White" or "Black"
+        self.piece_type = piece_type  # Piece type code: PAWN, KNIGHT, BISHOP, ROOK, QUEEN or KING
+        self.color = color  # Color code: WHITE or BLACK
         self.position = position  # Tuple (row, column)
         self.dimension = dimension  # 1 for left board, 2 for right board
         self.value = value
-        self.img = None
-    
+
+    def __repr__(self):
+        return f"{COLOR_NAMES[self.color]} {TYPE_NAMES[self.piece_type]} {self.position} board {self.dimension}"
+
     def legal_moves(self, current_board, opposing_board):
-        # This method will be implemented in subclasses. Defines the valid moves based on the piece type.
-        raise NotImplementedError
+        # Moves of the piece on its own board whose destination is free on the other board (the Alice transfer
+        # rule), castling and king safety aside. The same moves as BitBoard.generate_moves.
+        return generate_moves(self, current_board, opposing_board)
+
+def generate_moves(piece, current_board, opposing_board):
+    # One generator for every piece type, color and dimension, driven by the ray tables: it walks each ray until
+    # the first occupied square, which is a capture if it holds an enemy piece. Pawn rays are pushes, which never
+    # capture; pawn captures are the diagonal targets. Every move, capture or not, lands on the other board, so its
+    # destination must be empty there. This walks the matrices; the search uses the masks of BitBoard instead.
+
+    board, other = (current_board, opposing_board) if piece.dimension == 1 else (opposing_board, current_board)
+    color = piece.color
+    square = piece.position[0] * 8 + piece.position[1]
+    pawn = piece.piece_type == PAWN
+    moves = []
+    for ray in PIECE_RAYS[color][piece.piece_type][square]:
+        for target in ray:
+            occupant = board[target[0]][target[1]]
+            if occupant is not None:
+                if occupant.color != color and not pawn and other[target[0]][target[1]] is None:
+                    moves.append(target)
+                break
+            if other[target[0]][target[1]] is None:
+                moves.append(target)
+    if pawn:
+        for target in PAWN_CAPTURE_TARGETS[color][square]:
+            occupant = board[target[0]][target[1]]
+            if occupant is not None and occupant.color != color and other[target[0]][target[1]] is None:
+                moves.append(target)
+    return moves
 
 class Pawn(Piece):
+    __slots__ = ()
+
     def __init__(self, color, position, dimension, value):
-        super().__init__("Pawn", color, position, dimension, value)
-    
-    def legal_moves(self, current_board, opposing_board):
-        moves = []
-        row, col = self.position
-        if self.color == "White":
-            if self.dimension == 1:
-                if row + 1 < 8 and current_board[row + 1][col] is None and opposing_board[row + 1][col] is None:
-                    moves.append((row + 1, col))
-                if row == 1 and current_board[row + 2][col] is None and opposing_board[row + 2][col] is None:
-                    moves.append((row + 2, col))
-                if row + 1 < 8 and col + 1 < 8 and current_board[row + 1][col + 1] is not None and current_board[row + 1][col + 1].color != self.color:
-                    moves.append((row + 1, col + 1))
-                if row + 1 < 8 and col - 1 >= 0 and current_board[row + 1][col - 1] is not None and current_board[row + 1][col - 1].color != self.color:
-                    moves.append((row + 1, col - 1))
-            else:
-                if row + 1 < 8 and opposing_board[row + 1][col] is None and current_board[row + 1][col] is None:
-                    moves.append((row + 1, col))
-                if row == 1 and opposing_board[row + 2][col] is None and current_board[row + 2][col] is None:
-                    moves.append((row + 2, col))
-                if row + 1 < 8 and col + 1 < 8 and opposing_board[row + 1][col + 1] is not None and opposing_board[row + 1][col + 1].color != self.color:
-                    moves.append((row + 1, col + 1))
-                if row + 1 < 8 and col - 1 >= 0 and opposing_board[row + 1][col - 1] is not None and opposing_board[row + 1][col - 1].color != self.color:
-                    moves.append((row + 1, col - 1))
-        else:
-            if self.dimension == 1:
-                if row - 1 >= 0 and current_board[row - 1][col] is None and opposing_board[row - 1][col] is None:
-                    moves.append((row - 1, col))
-                if row == 6 and current_board[row - 2][col] is None and opposing_board[row - 2][col] is None:
-                    moves.append((row - 2, col))
-                if row - 1 >= 0 and col + 1 < 8 and current_board[row - 1][col + 1] is not None and current_board[row - 1][col + 1].color != self.color:
-                    moves.append((row - 1, col + 1))
-                if row - 1 >= 0 and col - 1 >= 0 and current_board[row - 1][col - 1] is not None and current_board[row - 1][col - 1].color != self.color:
-                    moves.append((row - 1, col - 1))
-            else:
-                if row - 1 >= 0 and opposing_board[row - 1][col] is None and current_board[row - 1][col] is None:
-                    moves.append((row - 1, col))
-                if row == 6 and opposing_board[row - 2][col] is None and current_board[row - 2][col] is None:
-                    moves.append((row - 2, col))
-                if row - 1 >= 0 and col + 1 < 8 and opposing_board[row - 1][col + 1] is not None and opposing_board[row - 1][col + 1].color != self.color:
-                    moves.append((row - 1, col + 1))
-                if row - 1 >= 0 and col - 1 >= 0 and opposing_board[row - 1][col - 1] is not None and opposing_board[row - 1][col - 1].color != self.color:
-                    moves.append((row - 1, col - 1))
-        return moves
+        super().__init__(PAWN, color, position, dimension, value)
 
     def promote(self):
         # Check if the pawn is on row 0 or 7
@@ -83,337 +79,99 @@ class Pawn(Piece):
         pass    
 
 class Rook(Piece):
+    __slots__ = ()
+
     def __init__(self, color, position, dimension, value):
-        super().__init__("Rook", color, position, dimension, value)
-    
-    def legal_moves(self, current_board, opposing_board):
-        moves = []
-        row, col = self.position
-        # Vertical moves
-        if self.dimension == 1:
-            for i in range(row + 1, 8):
-                if current_board[i][col] is None:
-                    moves.append((i, col))
-                elif current_board[i][col].color != self.color:
-                    moves.append((i, col))
-                    break
-                else:
-                    break
-
-            for i in range(row - 1, -1, -1):
-                if current_board[i][col] is None:
-                    moves.append((i, col))
-                elif current_board[i][col].color != self.color:
-                    moves.append((i, col))
-                    break
-                else:
-                    break
-
-            # Horizontal moves
-            for i in range(col + 1, 8):
-                if current_board[row][i] is None:
-                    moves.append((row, i))
-                elif current_board[row][i].color != self.color:
-                    moves.append((row, i))
-                    break
-                else:
-                    break
-
-            for i in range(col - 1, -1, -1):
-                if current_board[row][i] is None:
-                    moves.append((row, i))
-                elif current_board[row][i].color != self.color:
-                    moves.append((row, i))
-                    break
-                else:
-                    break
-        else:
-            for i in range(row + 1, 8):
-                if opposing_board[i][col] is None:
-                    moves.append((i, col))
-                elif opposing_board[i][col].color != self.color:
-                    moves.append((i, col))
-                    break
-                else:
-                    break
-
-            for i in range(row - 1, -1, -1):
-                if opposing_board[i][col] is None:
-                    moves.append((i, col))
-                elif opposing_board[i][col].color != self.color:
-                    moves.append((i, col))
-                    break
-                else:
-                    break
-
-            # Horizontal moves
-            for i in range(col + 1, 8):
-                if opposing_board[row][i] is None:
-                    moves.append((row, i))
-                elif opposing_board[row][i].color != self.color:
-                    moves.append((row, i))
-                    break
-                else:
-                    break
-
-            for i in range(col - 1, -1, -1):
-                if opposing_board[row][i] is None:
-                    moves.append((row, i))
-                elif opposing_board[row][i].color != self.color:
-                    moves.append((row, i))
-                    break
-                else:
-                    break
-                
-        return moves
+        super().__init__(ROOK, color, position, dimension, value)
 
 class Knight(Piece):
+    __slots__ = ()
+
     def __init__(self, color, position, dimension, value):
-        super().__init__("Knight", color, position, dimension, value)
-    
-    def legal_moves(self, current_board, opposite_board):
-        moves = []
-        row, col = self.position
-        possible_moves = [
-                (row + 2, col + 1), (row + 2, col - 1),
-                (row - 2, col + 1), (row - 2, col - 1),
-                (row + 1, col + 2), (row + 1, col - 2),
-                (row - 1, col + 2), (row - 1, col - 2)
-            ]
-        if self.dimension == 1:    
-            for move in possible_moves:
-                if 0 <= move[0] < 8 and 0 <= move[1] < 8:
-                    piece = current_board[move[0]][move[1]]
-                    if piece is None or piece.color != self.color:
-                        moves.append(move) 
-        else:
-            for move in possible_moves:
-                if 0 <= move[0] < 8 and 0 <= move[1] < 8:
-                    piece = opposite_board[move[0]][move[1]]
-                    if piece is None or piece.color != self.color:
-                        moves.append(move)
-        return moves
+        super().__init__(KNIGHT, color, position, dimension, value)
 
 class Bishop(Piece):
-    def __init__(self, color, position, dimension, value):
-        super().__init__("Bishop", color, position, dimension, value)
-    
-    def legal_moves(self, current_board, opposite_board):
-        moves = []
-        row, col = self.position
-        board = current_board if self.dimension == 1 else opposite_board
-        # Bishop movement directions: [up-right, up-left, down-right, down-left]
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        for dx, dy in directions:
-            for i in range(1, 8):  # Maximum of 7 steps on the board
-                new_row = row + i * dx
-                new_col = col + i * dy
-                if 0 <= new_row < 8 and 0 <= new_col < 8:  # Within board limits
-                    piece = board[new_row][new_col]
-                    if piece is None:  # Empty cell, valid move
-                        moves.append((new_row, new_col))
-                    elif piece.color != self.color:  # Cell occupied by an enemy piece
-                        moves.append((new_row, new_col))
-                        break  # Bishop cannot continue after capturing
-                    else:  # Cell occupied by an allied piece
-                        break  # Cannot continue through allied pieces
-                else:
-                    break  # Out of board limits
+    __slots__ = ()
 
-        return moves
+    def __init__(self, color, position, dimension, value):
+        super().__init__(BISHOP, color, position, dimension, value)
 
 class King(Piece):
+    __slots__ = ()
+
     def __init__(self, color, position, dimension, value):
-        super().__init__("King", color, position, dimension, value)
-    
-    def legal_moves(self, current_board, opposite_board):
-        moves = []
-        row, col = self.position
-        board = current_board if self.dimension == 1 else opposite_board
-        possible_moves = [
-                (row + 1, col), (row - 1, col),
-                (row, col + 1), (row, col - 1),
-                (row + 1, col + 1), (row + 1, col - 1),
-                (row - 1, col + 1), (row - 1, col - 1)
-            ]
-        for move in possible_moves:
-            if 0 <= move[0] < 8 and 0 <= move[1] < 8:
-                piece = board[move[0]][move[1]]
-                if piece is None or piece.color != self.color:
-                    moves.append(move)
-        return moves
+        super().__init__(KING, color, position, dimension, value)
 
-    def castle(self, current_board, opposite_board):
+    def castle(self, current_board, opposite_board, castling_rights=ALL_CASTLING):
+        # Castling needs the king and the rook unmoved on the left board, which the castling rights keep track of.
+        # Both jump to the other board, so the rook's landing square must be empty there too (the caller checks the
+        # king's).
         moves = []
-        row, col = self.position
-
-        if self.color == "White":
-            if self.dimension == 1 and self.position == (0, 4):
-                # Short castle
-                if isinstance(current_board[0][7], Rook) and current_board[0][7].dimension == 1:
-                    if current_board[0][5] is None and current_board[0][6] is None:
-                        moves.append((0, 6))
-                # Long castle
-                if isinstance(current_board[0][0], Rook) and current_board[0][0].dimension == 1:
-                    if current_board[0][1] is None and current_board[0][2] is None and current_board[0][3] is None:
-                        moves.append((0, 2))
+        if self.dimension != 1:
+            return moves
+        if self.color == WHITE:
+            row, short_right, long_right = 0, WHITE_SHORT, WHITE_LONG
         else:
-            if self.dimension == 1 and self.position == (7, 4):
-                # Short castle
-                if isinstance(current_board[7][7], Rook) and current_board[7][7].dimension == 1:
-                    if current_board[7][5] is None and current_board[7][6] is None:
-                        moves.append((7, 6))
-                # Long castle
-                if isinstance(current_board[7][0], Rook) and current_board[7][0].dimension == 1:
-                    if current_board[7][1] is None and current_board[7][2] is None and current_board[7][3] is None:
-                        moves.append((7, 2))
+            row, short_right, long_right = 7, BLACK_SHORT, BLACK_LONG
+        if self.position != (row, 4):
+            return moves
+        # Short castle
+        if castling_rights & short_right and isinstance(current_board[row][7], Rook):
+            if current_board[row][5] is None and current_board[row][6] is None and opposite_board[row][5] is None:
+                moves.append((row, 6))
+        # Long castle
+        if castling_rights & long_right and isinstance(current_board[row][0], Rook):
+            if current_board[row][1] is None and current_board[row][2] is None and current_board[row][3] is None \
+                    and opposite_board[row][3] is None:
+                moves.append((row, 2))
         return moves
 
     def in_check(self, current_board, opposite_board):
-        for piece in pieces:
-            if piece.color != self.color:
-                enemy_moves = piece.legal_moves(current_board, opposite_board)
-                if self.position in enemy_moves:
-                    return True
-        return False
+        # Alice rule: the attack only counts if the king's square on the other board is empty.
+        return board.in_check(self.color)
 
     def checkmate(self, current_board, opposite_board):
-        return True
+        return board.in_check(self.color) and not movegen.has_legal_moves(board, self.color)
 
     def stalemate(self):
-        pass  # Check if the king is in stalemate
+        return not board.in_check(self.color) and not movegen.has_legal_moves(board, self.color)
 
 class Queen(Piece):
-    def __init__(self, color, position, dimension, value):
-        super().__init__("Queen", color, position, dimension, value)
-    
-    def legal_moves(self, current_board, opposite_board):
-        moves = []
-        row, col = self.position
-        board = current_board if self.dimension == 1 else opposite_board
-
-        # Rook-like moves
-        for i in range(row + 1, 8):
-            if board[i][col] is None:
-                moves.append((i, col))
-            elif board[i][col].color != self.color:
-                moves.append((i, col))
-                break
-            else:
-                break
-
-        for i in range(row - 1, -1, -1):
-            if board[i][col] is None:
-                moves.append((i, col))
-            elif board[i][col].color != self.color:
-                moves.append((i, col))
-                break
-            else:
-                break
-
-        for i in range(col + 1, 8):
-            if board[row][i] is None:
-                moves.append((row, i))
-            elif board[row][i].color != self.color:
-                moves.append((row, i))
-                break
-            else:
-                break
-
-        for i in range(col - 1, -1, -1):
-            if board[row][i] is None:
-                moves.append((row, i))
-            elif board[row][i].color != self.color:
-                moves.append((row, i))
-                break
-            else:
-                break
-
-        # Bishop-like moves
-        for i in range(1, 8):
-            if row + i < 8 and col + i < 8:
-                if board[row + i][col + i] is None:
-                    moves.append((row + i, col + i))
-                elif board[row + i][col + i].color != self.color:
-                    moves.append((row + i, col + i))
-                    break
-                else:
-                    break
-            else:
-                break
+    __slots__ = ()
 
-        for i in range(1, 8):
-            if row + i < 8 and col - i >= 0:
-                if board[row + i][col - i] is None:
-                    moves.append((row + i, col - i))
-                elif board[row + i][col - i].color != self.color:
-                    moves.append((row + i, col - i))
-                    break
-                else:
-                    break
-            else:
-                break
+    def __init__(self, color, position, dimension, value):
+        super().__init__(QUEEN, color, position, dimension, value)
 
-        for i in range(1, 8):
-            if row - i >= 0 and col + i < 8:
-                if board[row - i][col + i] is None:
-                    moves.append((row - i, col + i))
-                elif board[row - i][col + i].color != self.color:
-                    moves.append((row - i, col + i))
-                    break
-                else:
-                    break
-            else:
-                break
+# Piece classes and values by piece type code, to create pieces that do not come from initialize_pieces
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
+PIECE_VALUES = (1, 3, 3, 5, 9, 100)
 
-        for i in range(1, 8):
-            if row - i >= 0 and col - i >= 0:
-                if board[row - i][col - i] is None:
-                    moves.append((row - i, col - i))
-                elif board[row - i][col - i].color != self.color:
-                    moves.append((row - i, col - i))
-                    break
-                else:
-                    break
-            else:
-                break
+def create_piece(piece_type, color, position, dimension):
+    return PIECE_CLASSES[piece_type](color, position, dimension, PIECE_VALUES[piece_type])
 
-        return moves
 def initialize_pieces():
+    # Sets up a new game. The board keeps the pieces from here on: its piece lists are the live roster.
     global board
-    global pieces
-    
-    board = board.Board()
+
+    board = BitBoard()
     
     pieces = []
-    # Create white pieces
-    pieces.append(Rook("White", (0, 0), 1, 5))
-    pieces.append(Knight("White", (0, 1), 1, 3))
-    pieces.append(Bishop("White", (0, 2), 1, 3))
-    pieces.append(Queen("White", (0, 3), 1, 9))
-    pieces.append(King("White", (0, 4), 1, 100))
-    pieces.append(Bishop("White", (0, 5), 1, 3))
-    pieces.append(Knight("White", (0, 6), 1, 3))
-    pieces.append(Rook("White", (0, 7), 1, 5))
-    for i in range(8):
-        pieces.append(Pawn("White", (1, i), 1, 1))
-    
-    # Create black pieces
-    pieces.append(Rook("Black", (7, 0), 1, 5))
-    pieces.append(Knight("Black", (7, 1), 1, 3))
-    pieces.append(Bishop("Black", (7, 2), 1, 3))
-    pieces.append(Queen("Black", (7, 3), 1, 9))
-    pieces.append(King("Black", (7, 4), 1, 100))
-    pieces.append(Bishop("Black", (7, 5), 1, 3))
-    pieces.append(Knight("Black", (7, 6), 1, 3))
-    pieces.append(Rook("Black", (7, 7), 1, 5))
-    for i in range(8):
-        pieces.append(Pawn("Black", (6, i), 1, 1))
+    back_rank = (ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK)
+    for color, first_row, pawn_row in ((WHITE, 0, 1), (BLACK, 7, 6)):
+        for i, piece_type in enumerate(back_rank):
+            pieces.append(create_piece(piece_type, color, (first_row, i), 1))
+        for i in range(8):
+            pieces.append(create_piece(PAWN, color, (pawn_row, i), 1))
 
     initialize_board(pieces)
     
 
+def set_board(new_board):
+    # Replaces the game with a board built elsewhere, such as a position read with notation.parse_position.
+    global board
+
+    board = new_board
+
 def initialize_board(pieces):
     for piece in pieces:
         board.add_piece(piece, piece.position)
@@ -426,144 +184,59 @@ def get_boards():
     return board.white_board, board.black_board
 
 def find_piece(position):
-    for piece in pieces:
-        if piece.position == position:
-            return piece
-    return None
+    return board.find_piece(position)
 
 def find_piece_in_general(position, pieces_list):
-    for piece in pieces_list:
-        if piece.position == position:
-            return piece
+    # The piece on the square, on either board, if it belongs to `pieces_list` (best passed as a set).
+    for candidate in (board.white_board[position[0]][position[1]], board.black_board[position[0]][position[1]]):
+        if candidate is not None and candidate in pieces_list:
+            return candidate
     return None
 
 def move(piece, position, simulate=False):
-    if board.white_board[position[0]][position[1]] is not None and board.black_board[position[0]][position[1]] is not None:
-        return False
-    king = next((p for p in pieces if isinstance(p, King) and p.color == piece.color), None)
-
-    if piece.color != king.color:
-        if position in piece.legal_moves(board.white_board, board.black_board):
-            if simulate:
-                return True
-            enemy_piece = find_piece_in_general(position, board.get_opponent_pieces(piece.color, piece.dimension))
-            if enemy_piece:
-                board._remove_piece(enemy_piece, position)
-                print(f"Removed: {enemy_piece.piece_type} {enemy_piece.position} {enemy_piece.color}")
-                if enemy_piece in pieces:
-                    pieces.remove(enemy_piece)
-            board.move_piece(piece, position)
-            return True
-        else:
-            return False
-
-    if king and king.in_check(board.white_board, board.black_board):
-        defensive_moves = []
-        defensive_pieces = []
-
-        board_to_check = board.white_board if king.dimension == 1 else board.black_board
-        moves_to_defend = []
-        defensive_pieces = []
-
-        for piece in pieces:
-            if piece.color != king.color:
-                moves_to_defend.extend(piece.legal_moves(board_to_check, board.black_board))
-            else:
-                defensive_pieces.extend(piece.legal_moves(board_to_check, board.black_board))
-
-        defensive_diff = set(defensive_pieces).difference(moves_to_defend).intersection(king.legal_moves(board_to_check, board.black_board))
-        print(defensive_diff)
-        if moves_to_defend == defensive_pieces:
-            print("Cannot defend")
-            return False
-        if piece.color == king.color:
-            if piece.piece_type == "King":
-                if position in defensive_diff:
-                    if simulate:
-                        return True
-                    board.move_piece(piece, position)
-                    return True
-                else:
-                    return False
-            else:
-                if position in defensive_diff:
-                    if simulate:
-                        return True
-                    board.move_piece(piece, position)
-                    return True
-                else:
-                    return False
-
-    if not king.in_check(board.white_board, board.black_board):
-        if isinstance(piece, King):
-            castle_moves = piece.castle(board.white_board, board.black_board)
-            if position in castle_moves:
-                if simulate:
-                    return True
-                if position[1] == 6:
-                    rook = find_piece((position[0], 7))
-                    board.move_piece(rook, (position[0], 5))
-                elif position[1] == 2:
-                    rook = find_piece((position[0], 0))
-                    board.move_piece(rook, (position[0], 3))
-                board.move_piece(piece, position)
-                return True
-        if position in piece.legal_moves(board.white_board, board.black_board):
-            if simulate:
-                return True
-            enemy_piece = find_piece_in_general(position, board.get_opponent_pieces(piece.color, piece.dimension))
-            if enemy_piece:
-                board._remove_piece(enemy_piece, position)
-                print(f"Removed: {enemy_piece.piece_type} {enemy_piece.position} {enemy_piece.color}")
-                if enemy_piece in pieces:
-                    pieces.remove(enemy_piece)
-            board.move_piece(piece, position)
-            return True
-        else:
-            return False
-    else:
+    # Plays the move if it is legal: the generator already covers the Alice transfer rule, castling, pins and checks.
+
+    if (piece, position) not in movegen.generate_legal_moves(board, piece.color):
         return False
+    if simulate:
+        return True
+    apply_move(piece, position)
+    return True
+
+def apply_move(piece, position):
+    # Plays a move on the game board. The board drops the captured piece, if any, from its piece lists.
+
+    enemy_piece = board.make_move(piece, position)
+    if enemy_piece:
+        print(f"Removed: {TYPE_NAMES[enemy_piece.piece_type]} {enemy_piece.position} {COLOR_NAMES[enemy_piece.color]}")
+    return enemy_piece
 
 def possible_moves(piece):
     print(piece.legal_moves(board.white_board, board.black_board))
 
 def indicate_check():
-    for piece in pieces:
-        if isinstance(piece, King):
-            if piece.in_check(board.white_board, board.black_board):
-                print(f"The {piece.color} king is in check.")
-                return True
+    for color in (WHITE, BLACK):
+        if board.in_check(color):
+            print(f"The {COLOR_NAMES[color]} king is in check.")
+            return True
     return False
 
+def kings():
+    return [piece for color in (WHITE, BLACK) for piece in board.get_pieces(color) if piece.piece_type == KING]
+
 def indicate_checkmate():
-    for piece in pieces:
-        if isinstance(piece, King):
-            if piece.in_checkmate(board.white_board, board.black_board):
-                return True
-    return False
+    return any(king.checkmate(board.white_board, board.black_board) for king in kings())
 
 def end_game():
-    # Check if one of the kings has been eliminated
-    kings = [piece for piece in pieces if isinstance(piece, King)]
-    if len(kings) < 2:
+    # The game ends when a king is gone or the side to move has no legal move (checkmate or stalemate).
+    if len(kings()) < 2:
         return True
-    return False
+    return not movegen.has_legal_moves(board, board.side_to_move)
 
 def get_piece_in_check():
-    king = next((piece for piece in pieces if isinstance(piece, King)), None)
-    pieces_in_check = []
-    for piece in pieces:
-        if piece.color != king.color:
-            enemy_moves = piece.legal_moves(board.white_board, board.black_board)
-            if king.position in enemy_moves:
-                pieces_in_check.append(piece)
-    return pieces_in_check
+    # Enemy pieces giving check to the king of the side to move.
+    return movegen.checkers(board, board.side_to_move)
 
 def is_check():
-    # Find the king of the current player
-    def find_king(color):
-        for row in (white_board if color == "White" else black_board):
-            for piece in row:
-                if piece and piece.piece_type == "King" and piece.color == color:
-                    return piece.position
-        return
+    # Tells whether the side to move is in check.
+    return board.in_check(board.side_to_move)
@@ -0,0 +1,143 @@
+'''
+selfplay.py
+Engine against engine matches in batch. The games are spread over a pool of worker processes, each one with its own
+copy of the engine of app.py. Every game starts with a few random moves so the games differ, then both sides play
+the engine's move with the given time or depth per move. A game ends in checkmate, stalemate, threefold repetition
+or when it reaches the ply limit (both draws).
+
+Each finished game is written as one line: the result, how it ended and its moves in the notation of notation.py,
+    1-0 checkmate 1e2e4 1e7e5 ...
+and a summary is printed at the end: results from White's side, average length, nodes per second and games per
+minute.
+
+    python selfplay.py --games 1000 --depth 2 --output games.txt
+    python selfplay.py --games 100 --time 0.2 --workers 4
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import app
+import movegen
+import notation
+import pieces
+from board import WHITE
+from transposition import TranspositionTable
+
+WORKERS = os.cpu_count() or 1
+RANDOM_PLIES = 4  # Random moves at the start of every game
+MAX_PLIES = 300  # Longer games are scored as draws
+HASH_MB = 4  # Table of each worker, cleared before every game
+
+def _start_worker(tt_size_mb):
+    # Pool initializer: every worker plays with its own table of tt_size_mb megabytes.
+
+    app.transposition_table = TranspositionTable(tt_size_mb)
+
+def play_game(game_index, seed, time_limit, max_depth, random_plies=RANDOM_PLIES, max_plies=MAX_PLIES):
+    # Plays one game in the current process. Returns (result, termination, moves, nodes, seconds searched).
+
+    generator = random.Random(seed + game_index)
+    pieces.initialize_pieces()
+    board = pieces.board
+    app.transposition_table.clear()
+    moves = []
+    seen = {board.hash: 1}
+    nodes = 0
+    searched = 0.0
+    while True:
+        color = board.side_to_move
+        legal = movegen.generate_legal_moves(board, color)
+        if not legal:
+            if board.in_check(color):
+                return ("0-1" if color == WHITE else "1-0"), "checkmate", moves, nodes, searched
+            return "1/2-1/2", "stalemate", moves, nodes, searched
+        if len(moves) >= max_plies:
+            return "1/2-1/2", "length", moves, nodes, searched
+
+        if len(moves) < random_plies:
+            move = generator.choice(legal)
+        else:
+            started = time.perf_counter()
+            move, stats = app.find_best_move(time_limit, None, max_depth)
+            searched += time.perf_counter() - started
+            nodes += stats.nodes
+        moves.append(notation.move_text(*move))
+        board.make_move(*move)
+
+        seen[board.hash] = seen.get(board.hash, 0) + 1
+        if seen[board.hash] >= 3:
+            return "1/2-1/2", "repetition", moves, nodes, searched
+
+def _play_game_task(arguments):
+    return play_game(*arguments)
+
+def run_match(games, workers=WORKERS, time_limit=None, max_depth=2, seed=0, random_plies=RANDOM_PLIES,
+              max_plies=MAX_PLIES, output=None, tt_size_mb=HASH_MB):
+    # Plays the games over a pool of processes, writing each record as it finishes. Returns the summary as a dict.
+
+    tasks = [(index, seed, time_limit, max_depth, random_plies, max_plies) for index in range(games)]
+    results = {"1-0": 0, "0-1": 0, "1/2-1/2": 0}
+    total_plies = total_nodes = 0
+    total_searched = 0.0
+    started = time.perf_counter()
+    record_file = open(output, "w") if output else None
+    try:
+        with multiprocessing.Pool(workers, initializer=_start_worker, initargs=(tt_size_mb,)) as pool:
+            for finished, (result, termination, moves, nodes, searched) in enumerate(
+                    pool.imap_unordered(_play_game_task, tasks), 1):
+                results[result] += 1
+                total_plies += len(moves)
+                total_nodes += nodes
+                total_searched += searched
+                if record_file:
+                    record_file.write(f"{result} {termination} {' '.join(moves)}\n")
+                if finished % max(1, games // 20) == 0 or finished == games:
+                    print(f"{finished}/{games} games", flush=True)
+    finally:
+        if record_file:
+            record_file.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "games": games,
+        "white_wins": results["1-0"],
+        "draws": results["1/2-1/2"],
+        "black_wins": results["0-1"],
+        "average_plies": total_plies / games if games else 0.0,
+        "nodes_per_second": total_nodes / total_searched if total_searched else 0.0,
+        "games_per_minute": games * 60 / elapsed if elapsed else 0.0,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Engine against engine matches over a process pool.")
+    parser.add_argument("--games", type=int, default=100, help="games to play")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes")
+    parser.add_argument("--time", type=float, default=None, help="seconds per move")
+    parser.add_argument("--depth", type=int, default=None, help="depth per move (default 2 without --time)")
+    parser.add_argument("--random-plies", type=int, default=RANDOM_PLIES, help="random moves at the start")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES, help="plies before a game is drawn")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random openings")
+    parser.add_argument("--output", default=None, help="file for the game records")
+    parser.add_argument("--hash", type=int, default=HASH_MB, help="transposition table size of each worker in MB")
+    arguments = parser.parse_args()
+
+    max_depth = arguments.depth or (app.MAX_DEPTH if arguments.time else 2)
+    summary = run_match(arguments.games, arguments.workers, arguments.time, max_depth, arguments.seed,
+                        arguments.random_plies, arguments.max_plies, arguments.output, arguments.hash)
+    games = summary["games"]
+    print(f"White wins {summary['white_wins']}, draws {summary['draws']}, Black wins {summary['black_wins']} "
+          f"({games} games)")
+    print(f"Average length {summary['average_plies']:.1f} plies")
+    print(f"{summary['nodes_per_second']:.0f} nodes/s, {summary['games_per_minute']:.1f} games/min")
@@ -0,0 +1,129 @@
+'''
+smp.py
+Parallel search (Lazy SMP). A pool of worker processes searches the same root position with the engine in app.py,
+every worker with its own board but all of them sharing one transposition table that lives in a
+multiprocessing.shared_memory block (the table entries are lockless, see transposition.py). What one worker stores
+the others find, so together they get deeper than one process alone. Odd workers skip the first iteration, which
+keeps the workers on different depths at the same time. The main process keeps the result of the deepest completed
+search. The pool and the table stay alive between moves.
+
+Run it directly to search the starting position and see the nodes per second:
+    python smp.py --workers 4 --hash 64 --time 5
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import argparse
+import atexit
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import app
+import pieces
+from board import TYPE_NAMES
+from transposition import TranspositionTable
+
+WORKERS = os.cpu_count() or 1
+TT_SIZE_MB = 64
+
+_pool = None
+_table_memory = None  # Owned by the main process
+_worker_table_memory = None  # Attached by each worker
+_configuration = None  # (workers, tt_size_mb) of the running pool
+_generation = 0
+
+def _attach_worker(table_name, tt_size_mb):
+    # Pool initializer: every worker plugs the shared table into its copy of the engine.
+
+    global _worker_table_memory
+    _worker_table_memory = shared_memory.SharedMemory(name=table_name)
+    app.transposition_table = TranspositionTable(tt_size_mb, _worker_table_memory.buf)
+
+def _search_worker(index, board, generation, time_limit, node_limit, max_depth):
+    # Searches the position in a worker. Returns (encoded best move, SearchStats).
+
+    pieces.board = board
+    app.transposition_table.generation = generation
+    best_move, stats = app.find_best_move(time_limit, node_limit, max_depth, start_depth=1 + index % 2)
+    return (board.encode_move(*best_move) if best_move else 0), stats
+
+def start(workers=WORKERS, tt_size_mb=TT_SIZE_MB):
+    # Creates the shared table and the worker pool, replacing them if the configuration changed.
+
+    global _pool, _table_memory, _configuration
+    if _configuration == (workers, tt_size_mb):
+        return
+    shutdown()
+    _table_memory = shared_memory.SharedMemory(create=True, size=TranspositionTable.table_bytes(tt_size_mb))
+    _pool = multiprocessing.Pool(workers, initializer=_attach_worker, initargs=(_table_memory.name, tt_size_mb))
+    _configuration = (workers, tt_size_mb)
+
+def shutdown():
+    # Stops the workers and frees the shared table.
+
+    global _pool, _table_memory, _configuration
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+        _pool = None
+    if _table_memory is not None:
+        _table_memory.close()
+        _table_memory.unlink()
+        _table_memory = None
+    _configuration = None
+
+atexit.register(shutdown)
+
+def parallel_find_best_move(workers=WORKERS, tt_size_mb=TT_SIZE_MB, time_limit=app.TIME_LIMIT, node_limit=None,
+                            max_depth=app.MAX_DEPTH):
+    # Same contract as app.find_best_move, searched by `workers` processes at once. The node limit is split
+    # between the workers. The returned stats are those of the worker whose move is played, with the counters and
+    # the deepest ply of all the workers.
+
+    global _generation
+    start(workers, tt_size_mb)
+    board = pieces.board
+    _generation = (_generation + 1) & 0xFF
+    worker_nodes = max(1, node_limit // workers) if node_limit is not None else None
+    pending = [_pool.apply_async(_search_worker, (index, board, _generation, time_limit, worker_nodes, max_depth))
+               for index in range(workers)]
+    results = [result.get() for result in pending]
+
+    # Deepest completed search wins; on a tie, the lowest worker
+    move_code, best = max(results, key=lambda result: result[1].depth)
+    records = [stats for _, stats in results]
+    stats = app.SearchStats(best.depth, best.score, max(record.elapsed for record in records),
+                            sum(record.nodes for record in records),
+                            sum(record.quiescence_nodes for record in records),
+                            sum(record.beta_cutoffs for record in records),
+                            sum(record.first_move_cutoffs for record in records),
+                            sum(record.tt_probes for record in records),
+                            sum(record.tt_hits for record in records),
+                            max(record.selective_depth for record in records))
+    stats.iterations = best.iterations
+    return (board.decode_move(move_code) if move_code else None), stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lazy SMP search of the starting position.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes")
+    parser.add_argument("--hash", type=int, default=TT_SIZE_MB, help="shared transposition table size in MB")
+    parser.add_argument("--time", type=float, default=app.TIME_LIMIT, help="seconds per search")
+    arguments = parser.parse_args()
+
+    pieces.initialize_pieces()
+    start(arguments.workers, arguments.hash)
+    started = time.perf_counter()
+    best_move, stats = parallel_find_best_move(arguments.workers, arguments.hash, arguments.time)
+    elapsed = time.perf_counter() - started
+    piece, move = best_move
+    print(f"Best move: {TYPE_NAMES[piece.piece_type]} {piece.position} -> {move}")
+    print(f"Depth {stats.depth}, {stats.nodes} nodes in {elapsed:.2f}s ({stats.nodes / elapsed:.0f} nodes/s)")
@@ -0,0 +1,117 @@
+'''
+transposition.py
+Transposition table for the search. Entries live in a flat array of 64-bit words, two words per entry, grouped in
+buckets of BUCKET_SIZE entries. The first entries of a bucket are depth-preferred: a new result only evicts the
+shallowest of them, and only if it was searched at least as deep (results of older searches count as the
+shallowest). Otherwise it goes to the last entry, which is always replaced.
+
+The words can live in any writable buffer, such as a multiprocessing shared memory block, so several processes can
+use the same table without locks: an entry stores the position hash XOR the data word next to the data word itself,
+and a probe only accepts it when XORing both gives back the hash. An entry torn by two concurrent writers fails that
+check and reads as a miss.
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+from array import array
+
+# Bound types
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+BUCKET_SIZE = 4
+ENTRY_BYTES = 16
+SCORE_OFFSET = 1 << 31
+
+# Layout of the data word: score (32 bits) | depth (8) | bound (2) | move (14) | generation (8)
+DEPTH_SHIFT = 32
+BOUND_SHIFT = 40
+MOVE_SHIFT = 42
+GENERATION_SHIFT = 56
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16, buffer=None):
+        # Allocates as many buckets as fit in size_mb megabytes, or lays them over an existing buffer of at least
+        # table_bytes(size_mb) bytes.
+
+        words = self.table_bytes(size_mb) // 8
+        self.bucket_count = words // (BUCKET_SIZE * 2)
+        if buffer is None:
+            self.table = array('Q', bytes(words * 8))
+        else:
+            self.table = memoryview(buffer).cast('Q')[:words]
+        self.generation = 0
+
+    @staticmethod
+    def table_bytes(size_mb):
+        # Size of the buffer a table of size_mb megabytes needs.
+
+        return max(1, size_mb * 1024 * 1024 // (ENTRY_BYTES * BUCKET_SIZE)) * BUCKET_SIZE * ENTRY_BYTES
+
+    def clear(self):
+        self.table[:] = array('Q', bytes(len(self.table) * 8))
+        self.generation = 0
+
+    def close(self):
+        # Lets go of an external buffer, so its owner can close it.
+
+        if isinstance(self.table, memoryview):
+            self.table.release()
+
+    def new_search(self):
+        # Ages the stored results, so the entries of previous searches are the first to be replaced.
+
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        # Returns (depth, score, bound, move) stored for the position, or None.
+
+        table = self.table
+        slot = (key % self.bucket_count) * BUCKET_SIZE * 2
+        for slot in range(slot, slot + BUCKET_SIZE * 2, 2):
+            data = table[slot + 1]
+            if table[slot] ^ data == key:
+                return ((data >> DEPTH_SHIFT) & 0xFF, (data & 0xFFFFFFFF) - SCORE_OFFSET,
+                        (data >> BOUND_SHIFT) & 3, (data >> MOVE_SHIFT) & 0x3FFF)
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        # Saves a search result following the depth-preferred/always-replace policy. A result without a best move
+        # keeps the move already stored for the same position.
+
+        table = self.table
+        first = (key % self.bucket_count) * BUCKET_SIZE * 2
+        last = first + (BUCKET_SIZE - 1) * 2
+        target = None
+        shallowest = None
+        for slot in range(first, last + 2, 2):
+            data = table[slot + 1]
+            if table[slot] ^ data == key:
+                target = slot
+                if not move:
+                    move = (data >> MOVE_SHIFT) & 0x3FFF
+                break
+            if slot == last:
+                break
+            if not data:
+                stored_depth = -2  # Empty entry
+            elif data >> GENERATION_SHIFT == self.generation:
+                stored_depth = (data >> DEPTH_SHIFT) & 0xFF
+            else:
+                stored_depth = -1
+            if shallowest is None or stored_depth < shallowest:
+                shallowest, candidate = stored_depth, slot
+        if target is None:
+            target = candidate if depth >= shallowest else last
+
+        data = ((int(score) + SCORE_OFFSET) | min(depth, 0xFF) << DEPTH_SHIFT | bound << BOUND_SHIFT
+                | move << MOVE_SHIFT | self.generation << GENERATION_SHIFT)
+        table[target] = key ^ data
+        table[target + 1] = data
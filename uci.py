@@ -0,0 +1,195 @@
+'''
+uci.py
+Line protocol to drive the engine of app.py from other programs through stdin/stdout, modeled on UCI. The process
+stays alive between searches, so the tables are built and the transposition table is kept only once. Moves use the
+notation of notation.py ("1e2e4": board, origin, destination).
+
+Commands:
+    uci                                     identify the engine, answered with "uciok"
+    isready                                 answered with "readyok"
+    ucinewgame                              forget the previous game (clears the transposition table)
+    position startpos [moves <move>...]     set the position from the initial one
+    position fen <position> [moves <move>...]
+                                            set the position from one in the notation of notation.py
+    go [depth N] [movetime MS] [nodes N] [wtime MS] [btime MS] [winc MS] [binc MS] [infinite]
+                                            search, printing "info" lines and then "bestmove <move>" (after
+                                            "stop" with infinite)
+    stop                                    end the search now; the best move found so far is reported
+    quit                                    exit
+
+The search runs in a separate thread, so "stop", "isready" and "quit" are read while it is thinking. Scores are
+given from the side to move, in centipawns or as "mate N".
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import sys
+import threading
+
+import app
+import notation
+import pieces
+from board import BLACK, WHITE
+
+ENGINE_NAME = "AjedrezAlicia"
+ENGINE_AUTHORS = "Manuel Arango, Alex Garcia, Sebastian Gomez, Stiven Henao"
+MOVES_TO_GO = 30  # Moves the remaining clock time is shared between when no movetime is given
+MATE_THRESHOLD = app.MATE_SCORE - 1000  # Scores beyond this are mates; no evaluation gets near them
+
+_search_thread = None
+_stop_requested = threading.Event()  # Set by "stop" or "quit"; an infinite search waits for it to send bestmove
+_output_lock = threading.Lock()
+
+def send(line):
+    with _output_lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+def score_text(score, color):
+    # Converts a score (positive for White) into the protocol's "cp X" or "mate N", seen from `color`.
+
+    if color == BLACK:
+        score = -score
+    if abs(score) > MATE_THRESHOLD:
+        plies = app.MATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+def set_position(arguments):
+    # position startpos [moves ...] or position fen <left board> <right board> <side> <castling> [moves ...]
+
+    if arguments and arguments[0] == "startpos":
+        pieces.initialize_pieces()
+        rest = arguments[1:]
+    elif arguments and arguments[0] == "fen":
+        try:
+            pieces.set_board(notation.parse_position(" ".join(arguments[1:5])))
+        except ValueError as error:
+            send(f"info string {error}")
+            return
+        rest = arguments[5:]
+    else:
+        send("info string expected 'position startpos' or 'position fen'")
+        return
+    if rest and rest[0] == "moves":
+        try:
+            notation.play_moves(pieces.board, rest[1:])
+        except ValueError as error:
+            send(f"info string {error}")
+
+def parse_go(arguments, color):
+    # Turns the go arguments into (time limit in seconds, node limit, max depth, infinite).
+
+    values = {}
+    index = 0
+    while index < len(arguments):
+        name = arguments[index]
+        if name == "infinite":
+            values[name] = True
+            index += 1
+        elif index + 1 < len(arguments):
+            try:
+                values[name] = int(arguments[index + 1])
+            except ValueError:
+                send(f"info string invalid value for {name}")
+            index += 2
+        else:
+            index += 1
+
+    max_depth = min(values.get("depth", app.MAX_DEPTH), app.MAX_DEPTH)
+    node_limit = values.get("nodes")
+    if "movetime" in values:
+        time_limit = values["movetime"] / 1000
+    elif "wtime" in values or "btime" in values:
+        remaining = values.get("wtime" if color == WHITE else "btime", 0)
+        increment = values.get("winc" if color == WHITE else "binc", 0)
+        time_limit = max(0.01, (remaining / MOVES_TO_GO + increment / 2) / 1000)
+    elif "infinite" in values or "depth" in values or "nodes" in values:
+        time_limit = None
+    else:
+        time_limit = app.TIME_LIMIT
+    return time_limit, node_limit, max_depth, "infinite" in values
+
+def search(time_limit, node_limit, max_depth, infinite=False):
+    # Body of the search thread: reports every iteration and the best move at the end. An infinite search that ends
+    # by itself (at the maximum depth, or with a single move to search) still sends its best move only after "stop".
+
+    board = pieces.board
+    color = board.side_to_move
+
+    def report(depth, score, best_move, nodes, seconds):
+        line = app.principal_variation(board, depth) or [best_move]
+        send(f"info depth {depth} score {score_text(score, color)} nodes {nodes} time {int(seconds * 1000)} "
+             f"nps {int(nodes / max(seconds, 1e-3))} pv {notation.line_text(board, line)}")
+
+    best_move, _ = app.find_best_move(time_limit, node_limit, max_depth, on_iteration=report)
+    if infinite:
+        _stop_requested.wait()
+    send(f"bestmove {notation.move_text(*best_move) if best_move else '0000'}")
+
+def start_search(arguments):
+    global _search_thread
+    stop_search()
+    time_limit, node_limit, max_depth, infinite = parse_go(arguments, pieces.board.side_to_move)
+    app.search_stop = False
+    _stop_requested.clear()
+    _search_thread = threading.Thread(target=search, args=(time_limit, node_limit, max_depth, infinite), daemon=True)
+    _search_thread.start()
+
+def stop_search():
+    # Ends the running search, if any, and waits for its bestmove.
+
+    global _search_thread
+    if _search_thread is not None:
+        app.search_stop = True
+        _stop_requested.set()
+        _search_thread.join()
+        _search_thread = None
+
+def handle(line):
+    # Runs one command. Returns False when the engine has to exit.
+
+    tokens = line.split()
+    if not tokens:
+        return True
+    command, arguments = tokens[0], tokens[1:]
+    if command == "uci":
+        send(f"id name {ENGINE_NAME}")
+        send(f"id author {ENGINE_AUTHORS}")
+        send("uciok")
+    elif command == "isready":
+        send("readyok")
+    elif command == "ucinewgame":
+        stop_search()
+        app.transposition_table.clear()
+        pieces.initialize_pieces()
+    elif command == "position":
+        stop_search()
+        set_position(arguments)
+    elif command == "go":
+        start_search(arguments)
+    elif command == "stop":
+        stop_search()
+    elif command == "quit":
+        stop_search()
+        return False
+    else:
+        send(f"info string unknown command: {command}")
+    return True
+
+def main():
+    for line in sys.stdin:
+        if not handle(line):
+            break
+    stop_search()
+
+if __name__ == "__main__":
+    main()
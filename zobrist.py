@@ -0,0 +1,25 @@
+'''
+zobrist.py
+Random 64-bit keys used to hash positions. A position hash is the XOR of one key per piece (by dimension, color,
+piece type and square), the side-to-move key when Black is to play and the key of the current castling rights.
+The generator is seeded so hashes are the same on every run.
+
+Elabaroted by:  Manuel Arango   2259571
+                Alex Garcia     2259517
+                Sebastian Gomez 2259474
+                Stiven Henao    2259603
+
+Teacher:        Joshua Triana
+Course:         Artificial Intelligence
+Date:           2024 December
+'''
+
+import random
+
+_generator = random.Random(2259603)
+
+# PIECE_KEYS[dimension - 1][color][piece type][square]
+PIECE_KEYS = [[[[_generator.getrandbits(64) for _ in range(64)] for _ in range(6)] for _ in range(2)] for _ in range(2)]
+SIDE_KEY = _generator.getrandbits(64)
+# One key per combination of the four castling rights
+CASTLING_KEYS = [_generator.getrandbits(64) for _ in range(16)]